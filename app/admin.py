@@ -1,11 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
+from .events import update_status
 from .models import (
     User, Organization, PropertyType, Property, PropertyImage, Agent,
     PropertyInquiry, PropertyVisit, SavedProperty, Service, HeroSlide,
     JourneyStep, AboutUs, PropertyAlert, Gallery, GalleryImage,
-    NewsCategory, News, CustomerMessage, CustomerDocument
+    NewsCategory, News, Conversation, CustomerMessage, CustomerDocument
 )
 
 
@@ -128,12 +129,23 @@ class AgentAdmin(admin.ModelAdmin):
     )
 
 
+def status_action(status, label):
+    # Goes through update_status so customers' event streams hear about the change
+    @admin.action(description=f'Mark selected as {label.lower()}')
+    def action(modeladmin, request, queryset):
+        count = update_status(queryset, status)
+        modeladmin.message_user(request, f'{count} marked as {label.lower()}.')
+    action.__name__ = f'mark_{status}'
+    return action
+
+
 @admin.register(PropertyInquiry)
 class PropertyInquiryAdmin(admin.ModelAdmin):
     list_display = ('customer', 'property', 'agent', 'status', 'created_at')
     list_filter = ('status', 'created_at')
     search_fields = ('customer__username', 'property__title')
     readonly_fields = ('created_at',)
+    actions = [status_action(*choice) for choice in PropertyInquiry.STATUS_CHOICES]
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('customer', 'property', 'agent')
@@ -145,6 +157,7 @@ class PropertyVisitAdmin(admin.ModelAdmin):
     list_filter = ('status', 'scheduled_date')
     search_fields = ('customer__username', 'property__title')
     date_hierarchy = 'scheduled_date'
+    actions = [status_action(*choice) for choice in PropertyVisit.STATUS_CHOICES]
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('customer', 'property', 'agent')
@@ -259,6 +272,20 @@ class NewsAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at', 'updated_at')
 
 
+@admin.register(Conversation)
+class ConversationAdmin(admin.ModelAdmin):
+    list_display = ('customer', 'agent', 'property', 'subject', 'message_count', 'unread_count', 'last_activity_at')
+    search_fields = ('customer__username', 'subject')
+    # Counters are maintained by CustomerMessage.save; see app.conversations
+    readonly_fields = (
+        'last_message', 'last_activity_at', 'message_count', 'unread_count', 'agent_unread_count',
+        'created_at', 'updated_at',
+    )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('customer', 'agent', 'property')
+
+
 @admin.register(CustomerMessage)
 class CustomerMessageAdmin(admin.ModelAdmin):
     list_display = ('customer', 'agent', 'subject', 'is_from_customer', 'is_read', 'created_at')
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        from django.core import checks
+
+        from . import conversations, covers, db, events, locations, lookups, news, queries, sync  # noqa: F401  (connects signal receivers)
+        from .routers import check_sticky_cache
+
+        checks.register(check_sticky_cache, checks.Tags.caches)
@@ -0,0 +1,331 @@
+"""
+Async versions of the hot public read endpoints, for ASGI deployments.
+
+Each view mirrors a DRF view from app.views. GET and HEAD are served with the
+async ORM, reusing that view's queryset, filters, serializer and paginator,
+so responses carry the same JSON. Any other method is handed to the DRF view
+unchanged. Middleware sees the DRF view class, so `query_budget` and
+`use_read_replica` apply as before.
+
+With settings.ASYNC_READ_VIEWS enabled these views take over the URLs of
+their DRF counterparts (see app/urls.py). Under ASGI a request then holds a
+worker thread only while its queries run, not while it waits on the client.
+
+CustomerEventStreamView streams app.events to customers over Server-Sent
+Events, replacing polling of the messages and inquiries endpoints.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from . import views
+from .compiled import CompiledListMixin
+from .events import broker, format_sse, get_events_config
+from .lookups import property_types
+from .news import articles as news_articles, cache_key as news_cache_key
+
+
+async def apaginate_queryset(paginator, queryset, request):
+    """Async counterpart of PageNumberPagination.paginate_queryset"""
+    page_size = paginator.get_page_size(request)
+    if not page_size:
+        return None
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    # Fill the paginator's cached count up front so it never queries synchronously
+    django_paginator.count = await queryset.acount()
+    page_number = paginator.get_page_number(request, django_paginator)
+    try:
+        page = django_paginator.page(page_number)
+    except InvalidPage as exc:
+        raise NotFound(paginator.invalid_page_message.format(page_number=page_number, message=str(exc)))
+    page.object_list = [obj async for obj in page.object_list]
+    paginator.page, paginator.request = page, request
+    return page.object_list
+
+
+class AsyncReadView(View):
+    drf_view = None
+    # Viewset action mapping, as the DRF router would pass it
+    actions = None
+    sync_view = None
+    # Same JSON renderer as the DRF views
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        sync_view = cls.drf_view.as_view(cls.actions) if cls.actions else cls.drf_view.as_view()
+        view = super().as_view(sync_view=sync_view, **initkwargs)
+        view.cls = cls.drf_view
+        view.csrf_exempt = True  # Like DRF views; DRF enforces CSRF for session auth itself
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+        view = self.drf_view()
+        if self.actions:
+            view.action_map = self.actions
+        view.args, view.kwargs, view.format_kwarg = args, kwargs, None
+        view.request = view.initialize_request(request, *args, **kwargs)
+        try:
+            # Authentication, permissions, throttles and versioning, as in APIView.dispatch
+            await sync_to_async(view.initial)(view.request, *args, **kwargs)
+            data = await self.get_data(view)
+        except (Http404, PermissionDenied, APIException) as exc:
+            if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+                # As APIView.handle_exception: 401 only with a WWW-Authenticate challenge to send
+                auth_header = view.get_authenticate_header(view.request)
+                if auth_header:
+                    exc.auth_header = auth_header
+                else:
+                    exc.status_code = 403
+            response = exception_handler(exc, {'view': view, 'request': view.request})
+            return self.render(response.data, response.status_code, request, headers=response.items())
+        return self.render(data, request=request)
+
+    async def get(self, request, *args, **kwargs):
+        # Never called; dispatch handles GET. Marks the view as async for Django.
+        raise NotImplementedError
+
+    async def get_data(self, view):
+        raise NotImplementedError
+
+    async def prepare(self, objects):
+        """Load anything serialization needs that is not on the fetched objects"""
+
+    def render(self, data, status=200, request=None, headers=()):
+        content = self.renderer.render(data)
+        response = HttpResponse(content, status=status, content_type='application/json')
+        for name, value in headers:
+            if name.lower() != 'content-type':
+                response[name] = value
+        if request is not None and request.method == 'HEAD':
+            # Same headers as GET, no body
+            response.content = b''
+            response['Content-Length'] = len(content)
+        return response
+
+
+class AsyncListView(AsyncReadView):
+    async def get_data(self, view):
+        queryset = view.filter_queryset(view.get_queryset())
+        # Same compiled fast path as the DRF view's list(), if it has one
+        compiled = view.get_compiled_serializer() if isinstance(view, CompiledListMixin) else None
+        if compiled is not None:
+            queryset = compiled.values(queryset)
+        paginator = view.paginator
+        objects = await apaginate_queryset(paginator, queryset, view.request) if paginator else None
+        if objects is None:
+            objects = [obj async for obj in queryset]
+        if compiled is not None:
+            data = await sync_to_async(compiled.serialize)(objects, view.get_serializer_context())
+        else:
+            await self.prepare(objects)
+            data = view.get_serializer(objects, many=True).data
+        return paginator.get_paginated_response(data).data if paginator else data
+
+
+class AsyncDetailView(AsyncReadView):
+    async def get_object(self, view):
+        queryset = view.filter_queryset(view.get_queryset())
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        try:
+            instance = await queryset.aget(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        await sync_to_async(view.check_object_permissions)(view.request, instance)
+        return instance
+
+    async def get_data(self, view):
+        instance = await self.get_object(view)
+        await self.prepare([instance])
+        return view.get_serializer(instance).data
+
+
+class AsyncFirstObjectView(AsyncDetailView):
+    """Singleton content whose DRF view returns the first matching row"""
+
+    async def get_object(self, view):
+        return await view.get_queryset().afirst()
+
+
+class PropertyListAsyncView(AsyncListView):
+    drf_view = views.PropertyViewSet
+    actions = {'get': 'list', 'head': 'list', 'post': 'create'}
+
+
+class PropertyDetailAsyncView(AsyncDetailView):
+    drf_view = views.PropertyViewSet
+    actions = {
+        'get': 'retrieve', 'head': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy',
+    }
+
+
+class PropertyTypeListAsyncView(AsyncListView):
+    drf_view = views.PropertyTypeListView
+
+
+class OrganizationDetailAsyncView(AsyncFirstObjectView):
+    drf_view = views.OrganizationDetailView
+
+
+class ServiceListAsyncView(AsyncListView):
+    drf_view = views.ServiceListView
+
+
+class HeroSlideListAsyncView(AsyncListView):
+    drf_view = views.HeroSlideListView
+
+
+class JourneyStepListAsyncView(AsyncListView):
+    drf_view = views.JourneyStepListView
+
+
+class AboutUsDetailAsyncView(AsyncFirstObjectView):
+    drf_view = views.AboutUsDetailView
+
+
+class TeamListAsyncView(AsyncListView):
+    drf_view = views.TeamListView
+
+
+class AgentListAsyncView(AsyncListView):
+    drf_view = views.AgentListView
+
+    async def prepare(self, agents):
+        # Specializations render from the in-process lookup table; make sure it holds these ids
+        # (unless ?fields= left them out and they were not prefetched)
+        ids = {
+            property_type.id for agent in agents if 'specializations' in getattr(agent, '_prefetched_objects_cache', {})
+            for property_type in agent.specializations.all()
+        }
+        await sync_to_async(property_types.get_many)(ids)
+
+
+class GalleryListAsyncView(AsyncListView):
+    drf_view = views.GalleryListView
+
+
+class GallerySummaryListAsyncView(AsyncListView):
+    drf_view = views.GallerySummaryListView
+
+
+class GalleryDetailAsyncView(AsyncDetailView):
+    drf_view = views.GalleryDetailView
+
+
+class NewsCategoryListAsyncView(AsyncListView):
+    drf_view = views.NewsCategoryListView
+
+
+class NewsListAsyncView(AsyncListView):
+    drf_view = views.NewsListView
+
+
+class NewsDetailAsyncView(AsyncDetailView):
+    drf_view = views.NewsDetailView
+
+    async def get_data(self, view):
+        key = news_cache_key(view.request, view.kwargs['slug'])
+        data = news_articles.get(key)
+        if data is None:
+            generation = news_articles.generation
+            data = await super().get_data(view)
+            news_articles.set(key, data, generation)
+        return data
+
+
+class CustomerEventStreamView(View):
+    """
+    GET /api/customer/events/ - Server-Sent Events for the authenticated customer.
+
+    Sends `message.created`, `inquiry.status` and `visit.status` events as
+    they are committed, with a comment line every HEARTBEAT_SECONDS to keep
+    proxies from closing the connection. Clients reconnecting with
+    Last-Event-ID get the events they missed from the replay buffer; a
+    `resync` event tells them to refetch over the REST API instead, when
+    that event has left the buffer or their queue overflowed.
+
+    Each open stream costs a coroutine under ASGI. Under WSGI it would pin a
+    worker thread, so there the stream ends after the first event or
+    heartbeat and EventSource reconnects, which amounts to long polling.
+    """
+
+    async def get(self, request):
+        user = await sync_to_async(self.authenticate)(request)
+        if user is None:
+            exc = NotAuthenticated()
+            return HttpResponse(
+                JSONRenderer().render({'detail': exc.detail}), status=exc.status_code, content_type='application/json',
+            )
+        try:
+            last_id = int(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id') or 0) or None
+        except ValueError:
+            last_id = None
+
+        if isinstance(request, ASGIRequest):
+            content = self.stream(user.id, last_id)
+        else:
+            # WSGI: wait for one event or heartbeat here and send a finite response
+            content = [chunk async for chunk in self.stream(user.id, last_id, once=True)]
+        response = StreamingHttpResponse(content, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Let nginx pass events through unbuffered
+        return response
+
+    @staticmethod
+    def authenticate(request):
+        drf_request = Request(
+            request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+        )
+        try:
+            user = drf_request.user
+        except APIException:
+            return None
+        return user if user.is_authenticated else None
+
+    async def stream(self, customer_id, last_id, once=False):
+        config = get_events_config()
+        subscription = broker.subscribe(customer_id)
+        try:
+            yield 'retry: 3000\n\n'
+            replayed = broker.replay(customer_id, last_id) if last_id else []
+            if replayed is None:
+                yield 'event: resync\ndata: {}\n\n'
+                if once:
+                    return
+                replayed = []
+            for event in replayed:
+                yield format_sse(event)
+            if once and replayed:
+                return
+            # Events delivered between subscribing and replaying are queued as well
+            replayed_ids = {event['id'] for event in replayed}
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), config['HEARTBEAT_SECONDS'])
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                else:
+                    if subscription.overflowed:
+                        subscription.overflowed = False
+                        yield 'event: resync\ndata: {}\n\n'
+                    if event['id'] in replayed_ids:
+                        replayed_ids.discard(event['id'])
+                    else:
+                        yield format_sse(event)
+                if once:
+                    return
+        finally:
+            broker.unsubscribe(subscription)
@@ -0,0 +1,194 @@
+"""
+In-process API benchmark runner.
+
+Each scenario builds requests against the public API and is driven through
+Django's test client (no network, no server), so results measure the
+application itself: URL routing, middleware, views, serializers and the ORM.
+Latencies are collected in app.perf histograms and reported as throughput and
+p50/p95/p99 per scenario in a JSON-serializable dict, so runs for different
+commits can be compared.
+"""
+import platform
+import random
+import subprocess
+import threading
+import time
+
+from django.conf import settings
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .datasets import LOCATIONS, PASSWORD
+from .models import Property, User
+from .perf import Histogram
+
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+class BenchmarkContext:
+    """Ids and credentials sampled once from the dataset and shared by scenarios"""
+
+    def __init__(self, sample_size=1000):
+        self.property_ids = list(
+            Property.objects.filter(is_active=True).order_by('?').values_list('id', flat=True)[:sample_size]
+        )
+        users = list(User.objects.filter(is_active=True, is_staff=False).order_by('id')[:50])
+        self.usernames = [user.username for user in users]
+        self.tokens = [Token.objects.get_or_create(user=user)[0].key for user in users]
+        self.page_count = max(1, Property.objects.filter(is_active=True).count() // 10)
+
+
+@scenario('listing')
+def listing(ctx, rng):
+    return 'get', f'/api/properties/?page={rng.randint(1, min(ctx.page_count, 50))}', {}
+
+
+@scenario('filter')
+def filter_properties(ctx, rng):
+    min_price = rng.randrange(1_000_000, 100_000_000, 1_000_000)
+    return 'get', f'/api/properties/?location={rng.choice(LOCATIONS)}&min_price={min_price}', {}
+
+
+@scenario('detail')
+def detail(ctx, rng):
+    return 'get', f'/api/properties/{rng.choice(ctx.property_ids)}/', {}
+
+
+@scenario('saved-properties')
+def saved_properties(ctx, rng):
+    return 'get', '/api/customer/saved-properties/', {'HTTP_AUTHORIZATION': f'Token {rng.choice(ctx.tokens)}'}
+
+
+@scenario('login')
+def login(ctx, rng):
+    return 'post', '/api/auth/login/', {'data': {'username': rng.choice(ctx.usernames), 'password': PASSWORD}}
+
+
+@scenario('contact')
+def contact(ctx, rng):
+    return 'post', '/api/contact/', {'data': {
+        'first_name': 'Bench', 'last_name': 'Mark', 'email': 'bench@example.com', 'phone': '9800000000',
+        'subject': rng.choice(['buying', 'selling', 'other']), 'message': 'Benchmark inquiry',
+        'preferred_contact': 'email',
+    }}
+
+
+def run_scenario(name, ctx, requests=200, concurrency=1, warmup=10, seed=0):
+    build = SCENARIOS[name]
+    histogram = Histogram()
+    errors = []
+    lock = threading.Lock()
+    per_worker = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def worker(index, count):
+        client = APIClient()
+        rng = random.Random(f'{seed}-{name}-{index}')
+        for _ in range(warmup // concurrency):
+            method, path, kwargs = build(ctx, rng)
+            getattr(client, method)(path, **kwargs)
+        for _ in range(count):
+            method, path, kwargs = build(ctx, rng)
+            start = time.perf_counter()
+            response = getattr(client, method)(path, **kwargs)
+            elapsed = time.perf_counter() - start
+            with lock:
+                histogram.record(elapsed * 1_000_000)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        # Same thread (and DB connection) as the caller
+        worker(0, requests)
+    else:
+        failures = []
+
+        def guarded(index, count):
+            try:
+                worker(index, count)
+            except Exception as e:
+                failures.append(e)
+
+        threads = [threading.Thread(target=guarded, args=(i, count)) for i, count in enumerate(per_worker)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if failures:
+            raise failures[0]
+    wall = time.perf_counter() - start
+
+    percentiles = histogram.percentiles((0.5, 0.95, 0.99))
+    return {
+        'requests': histogram.count,
+        'errors': len(errors),
+        'throughput_rps': round(histogram.count / wall, 2),
+        'mean_ms': round(histogram.total / max(histogram.count, 1) / 1000, 3),
+        'p50_ms': round(percentiles[0.5] / 1000, 3),
+        'p95_ms': round(percentiles[0.95] / 1000, 3),
+        'p99_ms': round(percentiles[0.99] / 1000, 3),
+        'max_ms': round(histogram.max / 1000, 3),
+    }
+
+
+# Throttling and per-request perf logging would distort the measurements
+BENCHMARK_SETTINGS = {
+    'PERF_MONITORING': {'ENABLED': False},
+    'QUERY_INSPECTOR': {'ENABLED': False},
+}
+
+
+def run(scenarios, requests=200, concurrency=1, warmup=10, seed=0, log=None):
+    log = log or (lambda message: None)
+    rest_framework = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+
+    with override_settings(REST_FRAMEWORK=rest_framework, **BENCHMARK_SETTINGS):
+        ctx = BenchmarkContext()
+        results = {}
+        for name in scenarios:
+            results[name] = run_scenario(name, ctx, requests, concurrency, warmup, seed)
+            log(f"{name:<18} {results[name]['throughput_rps']:>9.1f} req/s  "
+                f"p50 {results[name]['p50_ms']:>8.2f} ms  p95 {results[name]['p95_ms']:>8.2f} ms  "
+                f"p99 {results[name]['p99_ms']:>8.2f} ms  errors {results[name]['errors']}")
+
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'requests': requests,
+        'concurrency': concurrency,
+        'seed': seed,
+        'properties': Property.objects.count(),
+        'scenarios': results,
+    }
+
+
+def compare(report, baseline):
+    """Per-scenario relative change of throughput and latency percentiles against a baseline report"""
+    rows = {}
+    for name, result in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        rows[name] = {
+            metric: round((result[metric] - previous[metric]) / previous[metric] * 100, 1) if previous[metric] else None
+            for metric in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms')
+        }
+    return rows
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,301 @@
+"""
+Compiled read-only serialization for list endpoints.
+
+DRF serializes each row by walking its fields: get_attribute through the
+source path, to_representation, SkipField checks, a nested serializer per
+related row. CompiledSerializer does that walk once per serializer class
+and records, per output key, which `.values()` column to read and which
+conversion (if any) to apply. Rows are then fetched with `.values()` and
+turned into dicts in a tight loop; nested many-related serializers become one
+extra `.values()` query, like prefetch_related.
+
+The output is the same JSON the serializer produces. Only plain shapes
+compile: model fields, primary-key relations, dotted sources over non-null
+foreign keys, ReadOnlyFields over model properties and nested reverse
+relations. Anything else raises NotCompilable when the plan is built, so
+views fall back to the serializer.
+
+Plans are built per field selection (see app.fieldsets), so a `?fields=`
+request reads only the columns its fields need.
+"""
+import datetime
+import decimal
+import functools
+import re
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils.encoding import filepath_to_uri
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from .fieldsets import field_paths, project
+
+
+class NotCompilable(Exception):
+    pass
+
+
+# Fields whose to_representation returns DB values unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.CharField, serializers.IntegerField, serializers.BooleanField, serializers.ReadOnlyField,
+)
+
+
+class ModelRow:
+    """Stand-in for a model instance over a `.values()` row, so model @property code can run"""
+
+    def __init__(self, model, values):
+        self._model = model
+        self.__dict__.update(values)
+
+    def __getattr__(self, name):
+        # Only reached for names not in the row: class constants, other properties
+        return getattr(self._model, name)
+
+
+# Names filepath_to_uri would return unchanged
+URI_SAFE_NAME = re.compile(r"[A-Za-z0-9_.~!*()'/-]*").fullmatch
+
+
+def datetime_converter(field):
+    """DateTimeField.to_representation with the output timezone looked up once instead of per value"""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if not isinstance(value, datetime.datetime) or value.utcoffset() is None:
+            return field.to_representation(value)
+        text = value.astimezone(field_timezone).isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    return convert
+
+
+def decimal_converter(field):
+    """DecimalField.to_representation, skipping the quantize for values already at the field's scale"""
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+    exponent, max_digits = -field.decimal_places, field.max_digits
+
+    def convert(value):
+        if isinstance(value, decimal.Decimal):
+            _, digits, value_exponent = value.as_tuple()
+            if value_exponent == exponent and (max_digits is None or len(digits) <= max_digits):
+                return '{:f}'.format(value)
+        return field.to_representation(value)
+    return convert
+
+
+def file_url_function(storage, use_url, request):
+    """name -> URL, as serializers.FileField.to_representation renders a stored file"""
+    if not use_url:
+        return str
+
+    def url(name):
+        location = storage.url(name)
+        return request.build_absolute_uri(location) if request is not None else location
+
+    base_url = getattr(storage, 'base_url', None) or ''
+    if not (isinstance(storage, FileSystemStorage) and base_url.startswith('/') and base_url.endswith('/')
+            and not base_url.startswith('//')):
+        return url
+    prefix = request.build_absolute_uri(base_url) if request is not None else base_url
+
+    def fast_url(name):
+        # FileSystemStorage.url urljoins the quoted name onto base_url; for names without
+        # dot segments or empty segments that is plain concatenation, and the quoted name
+        # needs no further escaping in build_absolute_uri
+        relative = (name if URI_SAFE_NAME(name) else filepath_to_uri(name)).lstrip('/')
+        if relative.startswith('.') or '/.' in relative or '//' in relative:
+            return url(name)
+        return prefix + relative
+    return fast_url
+
+
+class CompiledSerializer:
+    def __init__(self, serializer_class, selection=None):
+        serializer = project(serializer_class(), selection)
+        children = dict(selection or ())
+        self.name = serializer_class.__name__
+        self.model = serializer.Meta.model
+        self.pk_column = self.model._meta.pk.attname
+        self.columns = {self.pk_column}
+        # Output key -> how to produce it:
+        #   ('value', column, converter factory or None to pass the value through)
+        #   ('file', column, storage, use_url)
+        #   ('property', model property)
+        #   ('nested', related CompiledSerializer, foreign key column on the related model)
+        # Converter factories run once per serialize() call, so they can resolve
+        # per-request state such as the active timezone up front.
+        self.plan = {}
+
+        for key, field in serializer.fields.items():
+            if not field.write_only:
+                self.plan[key] = self.plan_field(key, field, children.get(key))
+                if self.plan[key][0] == 'property':
+                    self.columns.update(self.property_columns(serializer, key, field))
+        self.columns = sorted(self.columns)
+        self.serialize_rows = self.build_function()
+
+    def plan_field(self, key, field, selection=None):
+        if isinstance(field, serializers.ListSerializer):
+            relation = self.get_model_field(self.model, field.source)
+            if not (isinstance(field.child, serializers.ModelSerializer) and isinstance(relation, models.ManyToOneRel)):
+                raise NotCompilable(f'{key}: only nested reverse foreign keys compile')
+            compiled = compiled_serializer(type(field.child), selection)
+            if compiled is None:
+                raise NotCompilable(f'{key}: nested {type(field.child).__name__} does not compile')
+            return ('nested', compiled, relation.field.attname)
+        if isinstance(field, (serializers.Serializer, serializers.SerializerMethodField, serializers.HiddenField)):
+            raise NotCompilable(f'{key}: {type(field).__name__} does not compile')
+
+        source_attrs = field.source_attrs
+        if len(source_attrs) == 1 and isinstance(getattr(self.model, field.source, None), property):
+            if not isinstance(field, serializers.ReadOnlyField):
+                raise NotCompilable(f'{key}: model properties compile only through ReadOnlyField')
+            return ('property', getattr(self.model, field.source))
+
+        model = self.model
+        for index, attr in enumerate(source_attrs):
+            model_field = self.get_model_field(model, attr)
+            if not isinstance(model_field, models.Field) or model_field.many_to_many:
+                raise NotCompilable(f'{key}: source {field.source!r} is not a column')
+            if index < len(source_attrs) - 1:
+                if not model_field.is_relation or model_field.null:
+                    # DRF skips the key when the relation is missing; leave that to the serializer
+                    raise NotCompilable(f'{key}: source {field.source!r} crosses a nullable relation')
+                model = model_field.related_model
+        column = '__'.join(source_attrs)
+        self.columns.add(column)
+
+        if model_field.is_relation:
+            if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None:
+                raise NotCompilable(f'{key}: only primary keys of relations compile')
+            return ('value', column, None)
+        if isinstance(field, serializers.FileField):
+            return ('file', column, model_field.storage, getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL))
+        if isinstance(field, PASSTHROUGH_FIELDS):
+            return ('value', column, None)
+        if isinstance(field, serializers.DateTimeField):
+            return ('value', column, functools.partial(datetime_converter, field))
+        if isinstance(field, serializers.DecimalField):
+            return ('value', column, functools.partial(decimal_converter, field))
+        return ('value', column, lambda: field.to_representation)
+
+    def property_columns(self, serializer, key, field):
+        """Columns a model property reads, from Meta.field_sources; all of them if it is not declared"""
+        concrete = self.model._meta.concrete_fields
+        paths = field_paths(serializer, key, field)
+        model_fields = [self.get_model_field(self.model, path) for path in paths or ()]
+        if paths is None or not all(model_field in concrete for model_field in model_fields):
+            return [model_field.attname for model_field in concrete]
+        return [model_field.attname for model_field in model_fields]
+
+    @staticmethod
+    def get_model_field(model, name):
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+    def build_function(self):
+        """
+        Generate `serialize_rows(rows, ModelRow, model, *helpers)`, which builds
+        each output dict as one literal in field order. `helpers` are the
+        converters, URL builders, properties and nested results that
+        serialize() passes for the plan's non-passthrough keys, in order.
+        """
+        helpers, items = [], []
+        for key, (kind, *spec) in self.plan.items():
+            name = f'helper_{len(helpers)}'
+            if kind == 'value' and spec[1] is None:
+                items.append(f'{key!r}: row[{spec[0]!r}]')
+                continue
+            helpers.append(name)
+            if kind == 'value':
+                # Like DRF, None skips to_representation
+                items.append(f'{key!r}: None if (value := row[{spec[0]!r}]) is None else {name}(value)')
+            elif kind == 'file':
+                items.append(f'{key!r}: {name}(value) if (value := row[{spec[0]!r}]) else None')
+            elif kind == 'property':
+                items.append(f'{key!r}: {name}(instance)')
+            else:
+                items.append(f'{key!r}: {name}.get(row[{self.pk_column!r}], [])')
+        lines = [
+            f'def serialize_rows(rows, ModelRow, model, {", ".join(helpers)}):',
+            '    results = []',
+            '    for row in rows:',
+        ]
+        if any(step[0] == 'property' for step in self.plan.values()):
+            lines.append('        instance = ModelRow(model, row)')
+        lines += ['        results.append({', *(f'            {item},' for item in items), '        })', '    return results']
+        namespace = {}
+        exec(compile('\n'.join(lines) + '\n', f'<compiled {self.name}>', 'exec'), namespace)
+        return namespace['serialize_rows']
+
+    def values(self, queryset):
+        """`queryset` reduced to the columns the plan reads"""
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def serialize(self, rows, context=None):
+        rows = list(rows)
+        request = (context or {}).get('request')
+        helpers = []
+        for kind, *spec in self.plan.values():
+            if kind == 'value' and spec[1] is not None:
+                helpers.append(spec[1]())
+            elif kind == 'file':
+                helpers.append(file_url_function(*spec[1:], request))
+            elif kind == 'property':
+                helpers.append(spec[0].fget)
+            elif kind == 'nested':
+                compiled, foreign_key = spec
+                helpers.append(compiled.related_rows(foreign_key, [row[self.pk_column] for row in rows], context))
+        return self.serialize_rows(rows, ModelRow, self.model, *helpers)
+
+    def related_rows(self, foreign_key, ids, context):
+        """Serialized related rows grouped by `foreign_key`, in the related model's default ordering"""
+        columns = self.columns if foreign_key in self.columns else [*self.columns, foreign_key]
+        rows = list(self.model._default_manager.filter(**{f'{foreign_key}__in': ids}).values(*columns))
+        grouped = defaultdict(list)
+        for row, data in zip(rows, self.serialize(rows, context)):
+            grouped[row[foreign_key]].append(data)
+        return grouped
+
+
+@functools.lru_cache(maxsize=256)
+def compiled_serializer(serializer_class, selection=None):
+    """The cached plan for `serializer_class` and a field selection, or None if it does not compile"""
+    try:
+        return CompiledSerializer(serializer_class, selection)
+    except NotCompilable:
+        return None
+
+
+class CompiledListMixin:
+    """
+    Serve the `list` action through the compiled plan for the view's
+    serializer class. Views whose serializer does not compile keep the
+    regular DRF path.
+    """
+
+    def get_compiled_serializer(self):
+        fieldset = self.get_fieldset() if hasattr(self, 'get_fieldset') else None
+        return compiled_serializer(self.get_serializer_class(), fieldset)
+
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+        queryset = compiled.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        data = compiled.serialize(page if page is not None else queryset, self.get_serializer_context())
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,154 @@
+"""
+Response compression (CompressionMiddleware).
+
+Text and JSON responses of at least MIN_SIZE bytes are sent brotli- or
+gzip-compressed, whichever the client's Accept-Encoding prefers (brotli on
+ties; it needs `pip install brotli`). Streaming responses such as the SSE
+event stream are left alone.
+
+Responses that caches may keep, i.e. with a positive `max-age` as set by
+`cache_page`, `patch_cache_control` or a view's `cache_max_age` attribute
+(see apply_max_age), repeat the same bytes until they expire. For those the compressed bytes are stored in the cache next to the
+raw ones, keyed by a digest of the raw body, so each cached payload is
+compressed once per encoding rather than once per request.
+
+Compressed sizes leak how well a secret in the body matches text an attacker
+reflected into it (BREACH). Responses that may hold per-user data - sent to
+a request with credentials or a session, setting cookies, or marked
+`Cache-Control: private` - are therefore only gzipped, with up to
+MAX_RANDOM_BYTES bytes of random padding in the gzip header, as Django's
+GZipMiddleware does, so their length no longer tracks the match.
+"""
+import gzip
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_max_age, patch_cache_control, patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+DEFAULT_CONFIG = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+    'CACHE_ALIAS': 'default',
+    # Upper bound on how long compressed copies of cached responses are kept
+    'CACHE_TIMEOUT': 600,
+    # Padding for responses that may carry per-user data; see the module docstring
+    'MAX_RANDOM_BYTES': 100,
+}
+
+COMPRESSIBLE_TYPES = re.compile(r'text/(?!event-stream)|application/(?:[\w.+-]*\+)?(?:json|xml|javascript)|image/svg\+xml')
+
+
+def get_compression_config():
+    return {**DEFAULT_CONFIG, **getattr(settings, 'COMPRESSION', {})}
+
+
+def available_encodings():
+    """Encodings this process can produce, in server preference order"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding, available=None):
+    """The encoding in `available` the Accept-Encoding header prefers, or None for identity"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, *params = part.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for coding in available or available_encodings():
+        quality = accepted.get(coding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(content, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(content, quality=config['BROTLI_QUALITY'])
+    # mtime=0 keeps the output deterministic for identical content
+    return gzip.compress(content, compresslevel=config['GZIP_LEVEL'], mtime=0)
+
+
+def is_personal(request, response):
+    """Whether `response` may contain data of the user making `request`"""
+    return bool(
+        response.cookies or 'private' in response.get('Cache-Control', '').lower()
+        or 'HTTP_AUTHORIZATION' in request.META or settings.SESSION_COOKIE_NAME in request.COOKIES
+    )
+
+
+def apply_max_age(request, response, max_age):
+    """
+    Mark a successful public GET response cacheable for `max_age` seconds.
+    Views opt in with a `cache_max_age` attribute; the content they serve is
+    the same for everyone and may be up to that old anyway.
+    """
+    if (max_age and request.method in ('GET', 'HEAD') and response.status_code == 200
+            and not response.has_header('Cache-Control') and not is_personal(request, response)):
+        patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def cached_compress(content, encoding, config, timeout):
+    """compress(), reusing the result stored for identical content"""
+    cache = caches[config['CACHE_ALIAS']]
+    level = config['BROTLI_QUALITY'] if encoding == 'br' else config['GZIP_LEVEL']
+    key = f'compressed:{encoding}:{level}:{hashlib.blake2b(content, digest_size=20).hexdigest()}'
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = compress(content, encoding, config)
+        cache.set(key, compressed, timeout)
+    return compressed
+
+
+def compress_response(request, response):
+    """Compress `response` in place when the client and the content allow it"""
+    config = get_compression_config()
+    if (response.streaming or response.has_header('Content-Encoding')
+            or not COMPRESSIBLE_TYPES.match(response.get('Content-Type', ''))
+            or len(response.content) < config['MIN_SIZE']):
+        return response
+    # The body now depends on Accept-Encoding, whether or not this client gets it compressed
+    patch_vary_headers(response, ('Accept-Encoding',))
+    personal = is_personal(request, response)
+    encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''), ('gzip',) if personal else None)
+    if encoding is None:
+        return response
+
+    max_age = get_max_age(response)
+    if personal:
+        # Django's compress_string pads with random bytes at a fixed level 6
+        compressed = compress_string(response.content, max_random_bytes=config['MAX_RANDOM_BYTES'])
+    elif max_age:
+        compressed = cached_compress(response.content, encoding, config, min(max_age, config['CACHE_TIMEOUT']))
+    else:
+        compressed = compress(response.content, encoding, config)
+    if len(compressed) >= len(response.content):
+        return response
+
+    response.content = compressed
+    response['Content-Length'] = str(len(compressed))
+    response['Content-Encoding'] = encoding
+    # Strong ETags name exact bytes; the compressed body is a different representation
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    return response
@@ -0,0 +1,94 @@
+"""
+Conversation threads for CustomerMessage.
+
+CustomerMessage.save files each message under its (customer, agent,
+property) Conversation and keeps the conversation's last message and unread
+counters current in the same transaction (see ConversationManager). This
+module covers the rest: recomputing counters after deletes, marking a thread
+read, and rebuilding conversations for messages written without save() -
+bulk_create, older rows migrated in 0011.
+
+The rebuild functions take the model classes as arguments so the data
+migration can pass its historical models.
+"""
+from django.db import transaction
+from django.db.models import BigIntegerField, Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Conversation, CustomerMessage
+
+
+def refresh_conversations(conversations, message_model=CustomerMessage):
+    """Recompute the denormalized fields of `conversations` from their messages"""
+    messages = message_model.objects.filter(conversation=OuterRef('pk')).order_by()
+
+    def count(condition=Q()):
+        counted = messages.filter(condition).values('conversation').annotate(total=Count('id')).values('total')
+        return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+    latest = messages.order_by('-created_at', '-id')
+    return conversations.update(
+        message_count=count(),
+        unread_count=count(Q(is_from_customer=False, is_read=False)),
+        agent_unread_count=count(Q(is_from_customer=True, is_read=False)),
+        last_message=Subquery(latest.values('id')[:1]),
+        last_activity_at=Coalesce(Subquery(latest.values('created_at')[:1]), F('last_activity_at')),
+        updated_at=timezone.now(),
+    )
+
+
+def null_key(field):
+    # Lets NULL agent/property match as equal; 0 is never a real id
+    return Coalesce(field, Value(0), output_field=BigIntegerField())
+
+
+def rebuild_conversations(conversation_model=Conversation, message_model=CustomerMessage, batch_size=1000):
+    """File messages without a conversation, creating conversations in bulk. Returns messages filed."""
+    orphans = message_model.objects.filter(conversation__isnull=True)
+    keys = orphans.order_by().values('customer_id', 'agent_id', 'property_id').distinct()
+    now = timezone.now()
+    with transaction.atomic():
+        conversation_model.objects.bulk_create(
+            (conversation_model(**key, subject='', last_activity_at=now) for key in keys.iterator()),
+            batch_size=batch_size, ignore_conflicts=True,
+        )
+        match = conversation_model.objects.annotate(
+            agent_key=null_key('agent_id'), property_key=null_key('property_id'),
+        ).filter(
+            customer_id=OuterRef('customer_id'),
+            agent_key=null_key(OuterRef('agent_id')),
+            property_key=null_key(OuterRef('property_id')),
+        )
+        # update() skips auto_now; bump updated_at so delta sync sends the refiled messages
+        filed = orphans.update(conversation=Subquery(match.values('pk')[:1]), updated_at=now)
+
+        first_subject = message_model.objects.filter(conversation=OuterRef('pk')).order_by('created_at', 'id')
+        untitled = conversation_model.objects.filter(subject='')
+        untitled.update(subject=Coalesce(Subquery(first_subject.values('subject')[:1]), Value('')))
+        refresh_conversations(conversation_model.objects.all(), message_model)
+    return filed
+
+
+def mark_read(conversation):
+    """Mark the agent's messages in `conversation` read for the customer"""
+    with transaction.atomic():
+        # update() skips auto_now; bump updated_at so delta sync picks the change up
+        updated = conversation.messages.filter(is_from_customer=False, is_read=False).update(
+            is_read=True, updated_at=timezone.now(),
+        )
+        if updated:
+            refresh_conversations(Conversation.objects.filter(pk=conversation.pk))
+    return updated
+
+
+@receiver(post_delete, sender=CustomerMessage)
+def message_deleted(sender, instance, origin=None, **kwargs):
+    # Runs inside the delete's transaction. Skip when the conversation itself is going away.
+    if instance.conversation_id is None:
+        return
+    if not (isinstance(origin, CustomerMessage) or getattr(origin, 'model', None) is CustomerMessage):
+        return
+    refresh_conversations(Conversation.objects.filter(pk=instance.conversation_id))
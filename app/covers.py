@@ -0,0 +1,50 @@
+"""
+Cover image and image count of Property listings.
+
+Listing cards show one image per property, so Property stores its cover
+(the primary image, else the one with the lowest order) and how many images
+it has. PropertyImage saves and deletes - AdminPropertyImageManagementViewSet,
+the Django admin inline - recompute both for the properties involved, and
+`?expand=` listings (see app.fieldsets) ship those two columns instead of
+every image record. Writes that skip signals - bulk_create, queryset update()
+- should call refresh_covers themselves.
+
+refresh_covers takes the image model as an argument so the data migration
+can pass its historical model.
+"""
+from django.db.models import CharField, Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Property, PropertyImage
+
+
+def refresh_covers(properties, image_model=PropertyImage):
+    """Recompute cover_image and image_count of `properties` from their images"""
+    images = image_model.objects.filter(property=OuterRef('pk')).order_by()
+    cover = images.order_by('-is_primary', 'order', 'id').values('image')[:1]
+    counted = images.values('property').annotate(total=Count('id')).values('total')
+    return properties.update(
+        cover_image=Coalesce(Subquery(cover), Value(''), output_field=CharField()),
+        image_count=Coalesce(Subquery(counted, output_field=IntegerField()), Value(0)),
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=PropertyImage)
+def image_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    property_ids = {instance.property_id, getattr(instance, '_loaded_property_id', None)} - {None}
+    refresh_covers(Property.objects.filter(pk__in=property_ids))
+    instance._loaded_property_id = instance.property_id
+
+
+@receiver(post_delete, sender=PropertyImage)
+def image_deleted(sender, instance, origin=None, **kwargs):
+    # Skip when the property itself is going away
+    if not (isinstance(origin, PropertyImage) or getattr(origin, 'model', None) is PropertyImage):
+        return
+    refresh_covers(Property.objects.filter(pk=instance.property_id))
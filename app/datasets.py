@@ -0,0 +1,292 @@
+"""
+Synthetic dataset generation for benchmarks and scaling tests.
+
+Tables are generated in dependency order, each split into fixed-size chunks
+that are written with bulk_create, optionally by a pool of worker processes.
+Every chunk draws from its own random.Random seeded with (seed, table, chunk)
+and parent rows get explicit primary keys, so the same seed produces the same
+rows whatever the number of workers.
+
+Activity is skewed the way real traffic is: properties and customers are
+picked from a Zipf-like distribution, so a few hot listings collect most
+inquiries, visits, saves and messages and a few heavy users produce most of
+them.
+"""
+import bisect
+import functools
+import itertools
+import multiprocessing
+import random
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+
+from .conversations import rebuild_conversations
+from .covers import refresh_covers
+from .db import database_names, setup_worker
+from .models import (
+    Agent, Contact, CustomerMessage, Property, PropertyImage, PropertyInquiry, PropertyType,
+    PropertyVisit, SavedProperty, User, property_display_fields,
+)
+
+
+SIZES = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+PROPERTY_TYPES = ['Land', 'House', 'Apartment', 'Commercial', 'Flat']
+
+LOCATIONS = [
+    'Kathmandu', 'Lalitpur', 'Bhaktapur', 'Pokhara', 'Chitwan', 'Butwal', 'Biratnagar',
+    'Dharan', 'Hetauda', 'Nepalgunj', 'Budhanilkantha', 'Baneshwor', 'Kirtipur', 'Thimi',
+]
+
+FIRST_NAMES = ['Aarav', 'Sita', 'Ram', 'Gita', 'Hari', 'Bikash', 'Anita', 'Suman', 'Pooja', 'Nabin', 'Sabina', 'Roshan']
+LAST_NAMES = ['Shrestha', 'Thapa', 'Gurung', 'Tamang', 'Karki', 'Adhikari', 'Maharjan', 'Rai', 'Joshi', 'Pandey']
+
+# Every generated user shares this password so benchmarks can log in
+PASSWORD = 'benchmark-pass-123'
+
+# Fixed reference date so generated dates do not depend on when the command runs
+EPOCH = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+# Zipf exponent for property popularity and user activity
+SKEW = 1.1
+
+
+def plan(properties):
+    """Row counts per table for a dataset of `properties` listings"""
+    return {
+        'users': max(10, properties // 10),
+        'agents': max(5, properties // 1000),
+        'properties': properties,
+        'property_images': properties,  # chunks of properties; ~3 images each
+        'saved_properties': properties,
+        'inquiries': properties // 2,
+        'visits': properties // 5,
+        'contacts': properties // 10,
+        'messages': properties,
+    }
+
+
+# Tables are generated phase by phase; tables within a phase only reference earlier phases
+PHASES = [
+    ['users', 'agents'],
+    ['properties'],
+    ['property_images', 'saved_properties', 'inquiries', 'visits', 'contacts', 'messages'],
+]
+
+
+@functools.lru_cache(maxsize=8)
+def zipf_cum_weights(n, skew=SKEW):
+    return list(itertools.accumulate(1 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+def zipf_pick(rng, first_id, n):
+    """Pick an id in [first_id, first_id + n) with Zipf-distributed popularity"""
+    cum_weights = zipf_cum_weights(n)
+    return first_id + bisect.bisect(cum_weights, rng.random() * cum_weights[-1])
+
+
+def random_datetime(rng, days=730):
+    return EPOCH - timedelta(seconds=rng.randrange(days * 86400))
+
+
+# Row builders: each yields model instances for `count` rows of one chunk
+def build_users(rng, start, count, refs):
+    for pk in range(start, start + count):
+        yield User(
+            id=pk, username=f'user{pk}', email=f'user{pk}@example.com', password=refs['password'],
+            first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+            phone_number=f'98{rng.randrange(10 ** 8):08d}', date_joined=random_datetime(rng),
+        )
+
+
+def build_agents(rng, start, count, refs):
+    for pk in range(start, start + count):
+        first_name = rng.choice(FIRST_NAMES)
+        yield Agent(
+            id=pk, first_name=first_name, last_name=rng.choice(LAST_NAMES),
+            email=f'agent{pk}@example.com', phone=f'98{rng.randrange(10 ** 8):08d}',
+            experience_years=rng.randint(0, 25), license_number=f'RE{pk:06d}',
+        )
+
+
+def build_properties(rng, start, count, refs):
+    for pk in range(start, start + count):
+        purpose = rng.choice(['land', 'rent'])
+        location = rng.choice(LOCATIONS)
+        listing = Property(
+            id=pk,
+            title=f'{rng.choice(["Plot", "House", "Flat", "Land"])} in {location} #{pk}',
+            description=f'Listing {pk} in {location}. ' * rng.randint(3, 20),
+            property_type_id=rng.choice(refs['property_types']),
+            price=Decimal(rng.randrange(500_000, 500_000_000, 1000)),
+            bedrooms=rng.randint(1, 6) if purpose == 'rent' else None,
+            property_purpose=purpose,
+            bathrooms=rng.randint(1, 4),
+            area=Decimal(rng.randint(1, 400)) / 4,
+            area_unit=rng.choice(['aana', 'ropani', 'dhur', 'bigha', 'kattha']),
+            land_ropani=rng.randint(0, 5),
+            land_aana=rng.randint(0, 15),
+            location=location,
+            address=f'Ward {rng.randint(1, 32)}, {location}',
+            latitude=Decimal(rng.randint(26_300_000, 30_400_000)) / 1_000_000,
+            longitude=Decimal(rng.randint(80_000_000, 88_200_000)) / 1_000_000,
+            is_featured=rng.random() < 0.05,
+        )
+        # bulk_create skips Property.save, which stores the display fields
+        listing.__dict__.update(property_display_fields(listing))
+        yield listing
+
+
+def build_property_images(rng, start, count, refs):
+    first_property = refs['properties'][0]
+    for pk in range(first_property + start, first_property + start + count):
+        for order in range(rng.choice([0, 1, 2, 2, 3, 3, 3, 4, 5, 8])):
+            yield PropertyImage(property_id=pk, image=f'properties/{pk}-{order}.jpg', is_primary=order == 0, order=order)
+
+
+def build_saved_properties(rng, start, count, refs):
+    for _ in range(count):
+        yield SavedProperty(customer_id=zipf_pick(rng, *refs['users']), property_id=zipf_pick(rng, *refs['properties']))
+
+
+def build_inquiries(rng, start, count, refs):
+    for _ in range(count):
+        yield PropertyInquiry(
+            customer_id=zipf_pick(rng, *refs['users']), property_id=zipf_pick(rng, *refs['properties']),
+            agent_id=refs['agents'][0] + rng.randrange(refs['agents'][1]),
+            message='Is this property still available?',
+            status=rng.choices(['pending', 'responded', 'closed'], weights=[5, 3, 2])[0],
+        )
+
+
+def build_visits(rng, start, count, refs):
+    for _ in range(count):
+        yield PropertyVisit(
+            customer_id=zipf_pick(rng, *refs['users']), property_id=zipf_pick(rng, *refs['properties']),
+            agent_id=refs['agents'][0] + rng.randrange(refs['agents'][1]),
+            scheduled_date=(EPOCH + timedelta(days=rng.randint(-60, 60))).date(),
+            scheduled_time=dt_time(rng.randint(9, 17), rng.choice([0, 30])),
+            status=rng.choices(['scheduled', 'completed', 'cancelled'], weights=[5, 4, 1])[0],
+        )
+
+
+def build_contacts(rng, start, count, refs):
+    for _ in range(count):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield Contact(
+            first_name=first_name, last_name=last_name, email=f'{first_name.lower()}@example.com',
+            phone=f'98{rng.randrange(10 ** 8):08d}',
+            subject=rng.choice(['buying', 'selling', 'investment', 'consultation', 'other']),
+            message='Please get in touch about listings in my area.',
+            preferred_contact=rng.choice(['email', 'phone', 'text']),
+            status=rng.choices(['new', 'in_progress', 'resolved', 'closed'], weights=[4, 2, 3, 1])[0],
+            customer_id=zipf_pick(rng, *refs['users']) if rng.random() < 0.3 else None,
+        )
+
+
+def build_messages(rng, start, count, refs):
+    for _ in range(count):
+        yield CustomerMessage(
+            customer_id=zipf_pick(rng, *refs['users']), property_id=zipf_pick(rng, *refs['properties']),
+            agent_id=refs['agents'][0] + rng.randrange(refs['agents'][1]),
+            subject='Regarding your listing', message='Could we schedule a viewing this week?',
+            is_from_customer=rng.random() < 0.6, is_read=rng.random() < 0.7,
+        )
+
+
+TABLES = {
+    'users': (User, build_users),
+    'agents': (Agent, build_agents),
+    'properties': (Property, build_properties),
+    'property_images': (PropertyImage, build_property_images),
+    'saved_properties': (SavedProperty, build_saved_properties),
+    'inquiries': (PropertyInquiry, build_inquiries),
+    'visits': (PropertyVisit, build_visits),
+    'contacts': (Contact, build_contacts),
+    'messages': (CustomerMessage, build_messages),
+}
+
+# Tables whose rows get explicit primary keys so later phases can reference them
+KEYED_TABLES = ('users', 'agents', 'properties')
+
+
+def generate_chunk(task):
+    """Build and insert one chunk. Runs in the parent or in a worker process."""
+    table, chunk_index, start, count, seed, refs, batch_size = task
+    model, build = TABLES[table]
+    rng = random.Random(f'{seed}:{table}:{chunk_index}')
+    rows = list(build(rng, start, count, refs))
+    with transaction.atomic():
+        # SavedProperty is unique per (customer, property); skewed picks collide
+        model.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=table == 'saved_properties')
+    return len(rows)
+
+
+def next_id(model):
+    return (model.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+
+
+def generate(properties, seed=0, workers=1, chunk_size=10_000, batch_size=2000, log=None):
+    """Generate a dataset around `properties` listings. Returns rows created per table."""
+    log = log or (lambda message: None)
+    counts = plan(properties)
+
+    refs = {
+        'password': make_password(PASSWORD),
+        'property_types': [PropertyType.objects.get_or_create(name=name)[0].id for name in PROPERTY_TYPES],
+    }
+    for table in KEYED_TABLES:
+        first = next_id(TABLES[table][0])
+        refs[table] = (first, counts[table])
+    starts = {table: refs[table][0] if table in KEYED_TABLES else 0 for table in TABLES}
+
+    # In-memory SQLite databases cannot be shared with worker processes
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        workers = 1
+
+    created = {}
+    pool = None
+    if workers > 1:
+        # Children must open their own connections rather than share ours
+        connections.close_all()
+        # The platform's default start method; fork is unavailable on Windows and unsafe on macOS
+        pool = multiprocessing.Pool(workers, initializer=setup_worker, initargs=(database_names(),))
+    try:
+        for phase in PHASES:
+            tasks = [
+                (table, index, starts[table] + offset, min(chunk_size, counts[table] - offset), seed, refs, batch_size)
+                for table in phase
+                for index, offset in enumerate(range(0, counts[table], chunk_size))
+            ]
+            results = pool.map(generate_chunk, tasks) if pool else [generate_chunk(task) for task in tasks]
+            for task, rows in zip(tasks, results):
+                created[task[0]] = created.get(task[0], 0) + rows
+            for table in phase:
+                log(f'{table}: {created.get(table, 0)} rows')
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    # Explicit primary keys bypass sequences on PostgreSQL and friends
+    sequence_sql = connection.ops.sequence_reset_sql(no_style(), [TABLES[table][0] for table in KEYED_TABLES])
+    if sequence_sql:
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+
+    # bulk_create skips the PropertyImage signals that keep listing covers current
+    if created.get('property_images'):
+        log(f'covers: {refresh_covers(Property.objects.all())} properties refreshed')
+    # bulk_create skips CustomerMessage.save, which files messages into conversations
+    if created.get('messages'):
+        log(f'conversations: {rebuild_conversations()} messages filed')
+    return created
@@ -0,0 +1,61 @@
+"""
+Database connection tuning.
+
+SQLite connections get DEFAULT_SQLITE_PRAGMAS, updated with any set in
+settings.SQLITE_PRAGMAS, as soon as they are opened. WAL lets readers proceed
+while a writer is active, and busy_timeout makes a blocked writer wait instead
+of failing with "database is locked". Write transactions start with BEGIN
+IMMEDIATE through the sqlite `transaction_mode` database option; see DATABASES
+in settings.
+
+setup_worker() readies a worker process of a multiprocessing pool to use the
+parent's databases, whichever start method the platform uses.
+"""
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,  # KiB, i.e. 64 MB
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+
+
+def get_sqlite_pragmas():
+    return {**DEFAULT_SQLITE_PRAGMAS, **getattr(settings, 'SQLITE_PRAGMAS', {})}
+
+
+def sqlite_pragma_statements(pragmas):
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in sqlite_pragma_statements(get_sqlite_pragmas()):
+            cursor.execute(statement)
+
+
+def database_names():
+    """{alias: NAME} of this process's connections, which tests point at their test databases"""
+    return {alias: connections[alias].settings_dict['NAME'] for alias in connections}
+
+
+def setup_worker(names):
+    """
+    Pool initializer. Spawned workers start with Django unconfigured and the
+    settings' database names; forked ones get both from the parent anyway.
+    This module imports no models, so workers can unpickle it before setup.
+    """
+    import django
+    django.setup()
+    for alias, name in names.items():
+        connections[alias].settings_dict['NAME'] = name
@@ -0,0 +1,41 @@
+"""
+Stored display fields of Property.
+
+Property.save() stores the formatted area, purpose, land area, square feet
+and map embed src next to the fields they come from (see
+property_display_fields), so listings read them as plain columns. Writes that
+skip save() - bulk_create, queryset update(), raw SQL, admin bulk actions -
+leave them stale: `check_property_display` reports such rows and
+`backfill_property_display` recomputes them.
+
+The functions take the model class as an argument so the data migration can
+pass its historical model.
+"""
+from .models import DISPLAY_FIELDS, DISPLAY_SOURCES, Property, property_display_fields
+
+
+def stale_properties(model=Property, batch_size=1000):
+    """Yield (property, {field: (stored, expected)}) for rows whose stored display fields are out of date"""
+    rows = model._base_manager.only(*DISPLAY_SOURCES, *DISPLAY_FIELDS).order_by('pk')
+    for row in rows.iterator(chunk_size=batch_size):
+        expected = property_display_fields(row)
+        differences = {
+            name: (getattr(row, name), value) for name, value in expected.items() if getattr(row, name) != value
+        }
+        if differences:
+            yield row, differences
+
+
+def backfill(model=Property, batch_size=1000):
+    """Recompute the stored display fields of every stale row. Returns rows updated."""
+    batch, updated = [], 0
+    for row, differences in stale_properties(model, batch_size):
+        for name, (_, value) in differences.items():
+            setattr(row, name, value)
+        batch.append(row)
+        if len(batch) >= batch_size:
+            updated += model._base_manager.bulk_update(batch, DISPLAY_FIELDS)
+            batch = []
+    if batch:
+        updated += model._base_manager.bulk_update(batch, DISPLAY_FIELDS)
+    return updated
@@ -0,0 +1,299 @@
+"""
+Live customer events: new messages and inquiry/visit status changes.
+
+Model signals turn committed changes into small JSON events addressed to one
+customer. QuerySet.update() sends no signals, so bulk status changes go
+through update_status(). Events are published on a channel and delivered by
+the in-process EventBroker to that customer's open streams (see
+CustomerEventStreamView). The broker also keeps a short per-customer replay
+buffer, so a client that reconnects with Last-Event-ID misses nothing.
+Buffers are in delivery order, which every process sees alike, and event ids
+only name a position in it: ids minted by different processes are unique but
+not ordered.
+
+The channel is pluggable through settings.EVENTS['CHANNEL']. LocalChannel
+delivers within the process. PostgresChannel fans events out to every
+process through LISTEN/NOTIFY, so a message saved by a WSGI worker reaches
+streams held open by an ASGI worker.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.fields import DateTimeField
+
+from .models import CustomerMessage, PropertyInquiry, PropertyVisit
+
+
+DEFAULT_CONFIG = {
+    'CHANNEL': 'app.events.LocalChannel',
+    'QUEUE_SIZE': 100,
+    'REPLAY_SIZE': 50,
+    # Replay buffers of customers with no newer event are dropped after this
+    'REPLAY_SECONDS': 300,
+    'HEARTBEAT_SECONDS': 15,
+}
+
+
+def get_events_config():
+    return {**DEFAULT_CONFIG, **getattr(settings, 'EVENTS', {})}
+
+
+class Subscription:
+    def __init__(self, customer_id, queue_size):
+        self.customer_id = customer_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+        # Set when events were dropped; the client must resync over the REST API
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class EventBroker:
+    """Thread-safe fan-out from any thread to asyncio subscribers"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        # customer id -> deque of (delivered at, event), least recently delivered to first
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+
+    def subscribe(self, customer_id):
+        """Subscribe the calling event loop to `customer_id`'s events"""
+        subscription = Subscription(customer_id, get_events_config()['QUEUE_SIZE'])
+        with self._lock:
+            self._subscribers[customer_id].add(subscription)
+        get_channel().start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.customer_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.customer_id]
+
+    def deliver(self, event):
+        customer_id = event['customer']
+        config = get_events_config()
+        now = time.monotonic()
+        with self._lock:
+            recent = self._recent.pop(customer_id, None) or deque()
+            recent.append((now, event))
+            while len(recent) > config['REPLAY_SIZE']:
+                recent.popleft()
+            self._recent[customer_id] = recent
+            while next(iter(self._recent.values()))[-1][0] < now - config['REPLAY_SECONDS']:
+                self._recent.popitem(last=False)
+            subscribers = list(self._subscribers.get(customer_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # Loop already closed; the stream is going away
+                self.unsubscribe(subscription)
+
+    def replay(self, customer_id, after_id=None):
+        """
+        Buffered events for `customer_id` delivered after the one with id
+        `after_id` (all of them without it), or None when newer events pushed
+        that one out of the buffer and the client has to resync.
+        """
+        oldest = time.monotonic() - get_events_config()['REPLAY_SECONDS']
+        with self._lock:
+            events = [event for delivered_at, event in self._recent.get(customer_id, ()) if delivered_at >= oldest]
+        if after_id is None or not events:
+            return events
+        for position, event in enumerate(events):
+            if event['id'] == after_id:
+                return events[position + 1:]
+        return None
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def reset(self):
+        with self._lock:
+            self._subscribers.clear()
+            self._recent.clear()
+
+
+broker = EventBroker()
+
+
+class LocalChannel:
+    """Delivers events to streams in this process only"""
+
+    def publish(self, event):
+        broker.deliver(event)
+
+    def start(self):
+        pass
+
+
+class PostgresChannel:
+    """
+    Cross-process channel over PostgreSQL LISTEN/NOTIFY (experimental).
+
+    Events are sent with pg_notify, which is transactional: they are delivered
+    when the publishing transaction commits. Each process runs one listener
+    thread on its own connection and delivers every notification, including
+    its own, to the local broker.
+    """
+    name = 'app_events'
+    # NOTIFY payloads are limited to 8000 bytes
+    max_payload = 7900
+
+    def __init__(self):
+        self._started = False
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        payload = json.dumps(event)
+        if len(payload.encode()) > self.max_payload:
+            # Too big to notify; the client fetches the full row over the REST API
+            event = {**event, 'data': {'id': event['data']['id']}, 'truncated': True}
+            payload = json.dumps(event)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.name, payload])
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self.listen, name='app-events-listener', daemon=True).start()
+
+    def listen(self):
+        import psycopg
+
+        while True:
+            try:
+                params = connection.get_connection_params()
+                params.pop('cursor_factory', None)
+                params.pop('context', None)
+                with psycopg.connect(**params, autocommit=True) as listener:
+                    listener.execute(f'LISTEN {self.name}')
+                    for notify in listener.notifies():
+                        broker.deliver(json.loads(notify.payload))
+            except Exception:
+                # Connection lost; reconnect after a pause. Streams resync via Last-Event-ID.
+                time.sleep(1)
+
+
+_channel = None
+_channel_lock = threading.Lock()
+
+
+def get_channel():
+    global _channel
+    with _channel_lock:
+        if _channel is None:
+            _channel = import_string(get_events_config()['CHANNEL'])()
+        return _channel
+
+
+_last_id = 0
+_id_lock = threading.Lock()
+
+
+def next_event_id():
+    """
+    Microsecond timestamps, strictly increasing within the process. Clocks of
+    other processes differ, so compare ids for equality only.
+    """
+    global _last_id
+    with _id_lock:
+        _last_id = max(_last_id + 1, time.time_ns() // 1000)
+        return _last_id
+
+
+def publish(event_type, customer_id, data):
+    event = {'id': next_event_id(), 'type': event_type, 'customer': customer_id, 'data': data}
+    get_channel().publish(event)
+    return event
+
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+datetime_field = DateTimeField()
+
+
+def message_data(message):
+    # Flat fields only; clients already hold the property and agent from the REST API
+    return {
+        'id': message.id,
+        'subject': message.subject,
+        'message': message.message,
+        'is_from_customer': message.is_from_customer,
+        'is_read': message.is_read,
+        'property': message.property_id,
+        'agent': message.agent_id,
+        'conversation': message.conversation_id,
+        'created_at': datetime_field.to_representation(message.created_at),
+    }
+
+
+@receiver(post_init, sender=PropertyInquiry)
+@receiver(post_init, sender=PropertyVisit)
+def remember_status(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred status field is not fetched
+    instance._loaded_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=CustomerMessage)
+def message_saved(sender, instance, created, **kwargs):
+    if created:
+        data = message_data(instance)
+        transaction.on_commit(lambda: publish('message.created', instance.customer_id, data))
+
+
+STATUS_EVENTS = {PropertyInquiry: 'inquiry.status', PropertyVisit: 'visit.status'}
+
+
+def publish_status(model, pk, property_id, customer_id, status):
+    data = {'id': pk, 'property': property_id, 'status': status}
+    transaction.on_commit(lambda: publish(STATUS_EVENTS[model], customer_id, data))
+
+
+@receiver(post_save, sender=PropertyInquiry)
+@receiver(post_save, sender=PropertyVisit)
+def status_saved(sender, instance, created, **kwargs):
+    if created or instance.status == instance._loaded_status:
+        return
+    instance._loaded_status = instance.status
+    publish_status(sender, instance.id, instance.property_id, instance.customer_id, instance.status)
+
+
+def update_status(queryset, status):
+    """
+    Set the status of every inquiry or visit in queryset, publishing the
+    status events that a plain QuerySet.update() would skip. Bulk status
+    changes should go through here. Returns the number of rows changed.
+    """
+    model = queryset.model
+    with transaction.atomic(using=queryset.db):
+        rows = list(queryset.exclude(status=status).values_list('id', 'property_id', 'customer_id'))
+        model._base_manager.using(queryset.db).filter(id__in=[row[0] for row in rows]).update(
+            status=status, updated_at=timezone.now(),
+        )
+        for pk, property_id, customer_id in rows:
+            publish_status(model, pk, property_id, customer_id, status)
+    return len(rows)
@@ -0,0 +1,211 @@
+"""
+Sparse fieldsets for read endpoints: `?fields=` and `?expand=`.
+
+    /api/properties/?fields=id,title,price,latitude,longitude
+    /api/properties/?fields=id,title&expand=images
+    /api/properties/?fields=id,title,images.image
+    /api/news/?expand=
+
+Without either parameter responses are unchanged. With one of them, a
+response carries the plain fields named in `fields` (all plain fields if
+`fields` is missing) and only those nested serializers named in `expand` or
+`fields`. A dotted name such as `images.image` also narrows the nested
+serializer's own fields.
+
+The selection reaches the queries too: SparseFieldsMixin loads only the
+columns the kept fields read (`.only()`), keeps only the joins and prefetches
+they use, and the compiled listing path selects just those columns with
+`.values()`. Model properties and method fields say which columns they read
+through `Meta.field_sources` on the serializer; without an entry the whole row
+is loaded.
+"""
+import functools
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+def nested_serializer(field):
+    """The serializer `field` renders rows with, if it is a nested serializer"""
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+
+def split_names(names):
+    """'a,b.c,b.d' -> ({'a', 'b'}, {'b': ['c', 'd']})"""
+    top, children = set(), {}
+    for name in names:
+        head, _, rest = name.partition('.')
+        top.add(head)
+        if rest:
+            children.setdefault(head, []).append(rest)
+    return top, children
+
+
+def select_fields(fields, requested=None, expand=()):
+    """
+    Resolve `requested` and `expand` names against a serializer's `fields`.
+    Returns a tuple of (key, child selection) pairs, where a child selection
+    of None keeps all of a nested serializer's fields.
+    """
+    top_requested, requested_children = split_names(requested) if requested is not None else (None, {})
+    top_expand, expand_children = split_names(expand)
+    unknown = ((top_requested or set()) | top_expand) - fields.keys()
+    if unknown:
+        raise ValidationError({'fields': [f'Unknown field: {name}' for name in sorted(unknown)]})
+
+    selection = []
+    for key, field in fields.items():
+        nested = nested_serializer(field)
+        if nested is None:
+            if top_requested is None or key in top_requested:
+                selection.append((key, None))
+        elif key in top_expand or key in (top_requested or ()):
+            if key in requested_children or key in expand_children:
+                child = select_fields(nested.fields, requested_children.get(key), expand_children.get(key, ()))
+            else:
+                child = None
+            selection.append((key, child))
+    return tuple(selection)
+
+
+@functools.lru_cache(maxsize=256)
+def get_selection(serializer_class, requested, expand):
+    """Cached select_fields for a serializer class and the raw query parameters"""
+    names = lambda value: [name.strip() for name in value.split(',') if name.strip()]
+    return select_fields(
+        serializer_class().fields, names(requested) if requested is not None else None, names(expand or ''),
+    )
+
+
+def project(serializer, selection):
+    """Drop the fields of `serializer` that `selection` leaves out, recursively. Returns `serializer`."""
+    if selection is None:
+        return serializer
+    target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+    kept = dict(selection)
+    for key in list(target.fields):
+        if key not in kept:
+            del target.fields[key]
+        elif kept[key] is not None:
+            project(target.fields[key], kept[key])
+    return serializer
+
+
+def field_paths(serializer, key, field):
+    """Model lookups `field` reads, e.g. ['property_type__name'], or None if unknown"""
+    declared = getattr(serializer.Meta, 'field_sources', {})
+    if key in declared:
+        return [path.replace('.', '__') for path in declared[key]]
+    if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+        return None
+    return ['__'.join(field.source_attrs)]
+
+
+def requirements(serializer):
+    """
+    What loading `serializer`'s model rows takes: (columns for `.only()` or
+    None to load whole rows, relation names to join or prefetch)
+    """
+    model = serializer.Meta.model
+    everything = None, {model_field.name for model_field in model._meta.get_fields() if model_field.is_relation}
+    columns, relations = set(), set()
+    for key, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        paths = field_paths(serializer, key, field)
+        if paths is None:
+            return everything
+        nested = nested_serializer(field) is not None
+        for path in paths:
+            root, _, rest = path.partition('__')
+            try:
+                model_field = model._meta.get_field(root)
+            except FieldDoesNotExist:
+                # A model property missing from Meta.field_sources
+                return everything
+            if model_field.concrete and not model_field.many_to_many:
+                columns.add(root if nested else path)
+            if model_field.is_relation and (rest or nested or not model_field.concrete or model_field.many_to_many):
+                relations.add(root)
+    return columns, relations
+
+
+def select_related_paths(select_related, prefix=''):
+    """Flatten Query.select_related ({'a': {'b': {}}}) into ['a__b']"""
+    paths = []
+    for name, children in select_related.items():
+        path = prefix + name
+        paths.extend(select_related_paths(children, path + '__') if children else [path])
+    return paths
+
+
+def project_queryset(queryset, serializer):
+    """
+    `queryset` reduced to what the (projected) `serializer` reads: `.only()`
+    its columns, and drop joins and prefetches no kept field uses. Nested
+    many-related serializers narrowed by the selection get a Prefetch that
+    loads only their columns.
+    """
+    target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+    columns, relations = requirements(target)
+    if isinstance(queryset.query.select_related, dict):
+        paths = select_related_paths(queryset.query.select_related)
+        queryset = queryset.select_related(None).select_related(
+            *[path for path in paths if path.partition('__')[0] in relations]
+        )
+    lookups = []
+    for lookup in queryset._prefetch_related_lookups:
+        name = lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+        if name.partition('__')[0] not in relations:
+            continue
+        lookups.append(narrowed_prefetch(target, lookup) if isinstance(lookup, str) and name in target.fields else lookup)
+    queryset = queryset.prefetch_related(None).prefetch_related(*lookups)
+    return queryset.only(*columns) if columns is not None else queryset
+
+
+def narrowed_prefetch(serializer, lookup):
+    """Prefetch for the nested serializer at `lookup`, loading only the columns it reads"""
+    field = serializer.fields[lookup]
+    nested = nested_serializer(field)
+    relation = serializer.Meta.model._meta.get_field(lookup)
+    if nested is None or not relation.one_to_many:
+        return lookup
+    columns, relations = requirements(nested)
+    if columns is None or relations:
+        return lookup
+    # The reverse foreign key must be loaded to group rows by their parent
+    queryset = relation.related_model._default_manager.only(*columns, relation.field.name)
+    return Prefetch(lookup, queryset=queryset)
+
+
+class SparseFieldsMixin:
+    """
+    `?fields=` / `?expand=` for a DRF view's GET responses: serializers drop
+    the fields not asked for and filter_queryset() loads only what the rest read.
+    """
+
+    def get_fieldset(self):
+        """The field selection for this request, or None for full responses"""
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return None
+        params = request.query_params
+        if 'fields' not in params and 'expand' not in params:
+            return None
+        return get_selection(self.get_serializer_class(), params.get('fields'), params.get('expand'))
+
+    def get_serializer(self, *args, **kwargs):
+        return project(super().get_serializer(*args, **kwargs), self.get_fieldset())
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fieldset = self.get_fieldset()
+        if fieldset is None:
+            return queryset
+        return project_queryset(queryset, project(self.get_serializer_class()(), fieldset))
@@ -0,0 +1,190 @@
+"""
+In-process prefix index of property locations, for autocomplete.
+
+The distinct locations of active properties are loaded with one grouped
+query on first use, normalized (case-folded, whitespace collapsed) and kept
+with their listing counts. Every word of a location starts an entry in a
+sorted array, so `jham` finds "Lalitpur, Jhamsikhel" with a bisect rather
+than a table scan.
+
+Local property saves and deletes adjust the counts as they commit; the TTL
+bounds staleness for changes made by other processes or without save().
+Loads query without holding the lock, and one that overlapped such an
+adjustment is used for that search only, since it may already count it.
+"""
+import bisect
+import heapq
+import re
+import threading
+import time
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Property
+
+
+WORD = re.compile(r'\w+')
+
+
+def normalize(location):
+    return ' '.join(location.split()).casefold()
+
+
+class LocationIndex:
+    ttl = 300
+    # Answers kept between changes; one-letter prefixes can match most of the index
+    max_cached_results = 4096
+
+    def __init__(self):
+        self._counts = None
+        # Normalized location -> the spelling shown for it
+        self._display = {}
+        # Sorted (text from a word start to the end, normalized location)
+        self._terms = []
+        self._results = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        # Held while querying, so one thread loads and the others wait for it
+        self._load_lock = threading.Lock()
+        # Bumped by add() and invalidate(), so a load that raced a change is not kept
+        self.generation = 0
+
+    def _load(self):
+        rows = Property.objects.filter(is_active=True).values('location').annotate(listings=Count('id')).order_by()
+        counts, display, best = {}, {}, {}
+        for row in rows:
+            key = normalize(row['location'])
+            if not key:
+                continue
+            counts[key] = counts.get(key, 0) + row['listings']
+            # The most used spelling wins
+            if row['listings'] > best.get(key, 0):
+                display[key], best[key] = ' '.join(row['location'].split()), row['listings']
+        terms = sorted((key[match.start():], key) for key in counts for match in WORD.finditer(key))
+        return counts, display, terms
+
+    def _is_fresh(self):
+        # Called with the lock held
+        return self._counts is not None and time.monotonic() - self._loaded_at <= self.ttl
+
+    def _reload(self):
+        """
+        Query outside the lock and swap the result in. Returns the loaded
+        index if a change landed meanwhile, as it may or may not include that
+        change and is only fit to answer the current search; else None.
+        """
+        with self._load_lock:
+            with self._lock:
+                if self._is_fresh():
+                    return None
+                generation = self.generation
+            counts, display, terms = self._load()
+            with self._lock:
+                if generation != self.generation:
+                    return counts, display, terms
+                self._counts, self._display, self._terms = counts, display, terms
+                self._results = {}
+                self._loaded_at = time.monotonic()
+        return None
+
+    @staticmethod
+    def _match(counts, display, terms, prefix, limit):
+        if prefix:
+            keys = set()
+            index = bisect.bisect_left(terms, (prefix,))
+            while index < len(terms) and terms[index][0].startswith(prefix):
+                keys.add(terms[index][1])
+                index += 1
+        else:
+            keys = counts.keys()
+        top = heapq.nsmallest(limit, keys, key=lambda key: (-counts[key], key))
+        return [(display[key], counts[key]) for key in top]
+
+    def search(self, query, limit=10):
+        """[(location, listings)] of the most listed locations with a word starting with `query`"""
+        prefix = normalize(query)
+        while True:
+            with self._lock:
+                if self._is_fresh():
+                    cached = self._results.get((prefix, limit))
+                    if cached is not None:
+                        return cached
+                    results = self._match(self._counts, self._display, self._terms, prefix, limit)
+                    if len(self._results) >= self.max_cached_results:
+                        self._results = {}
+                    self._results[prefix, limit] = results
+                    return results
+            raced = self._reload()
+            if raced is not None:
+                return self._match(*raced, prefix, limit)
+
+    def add(self, location, delta):
+        """Count `delta` more listings at `location`; a no-op until the index is loaded"""
+        key = normalize(location or '')
+        if not key:
+            return
+        with self._lock:
+            self.generation += 1
+            if self._counts is None:
+                return
+            self._results = {}
+            count = self._counts.get(key, 0) + delta
+            terms = [(key[match.start():], key) for match in WORD.finditer(key)]
+            if count > 0 and key not in self._counts:
+                self._display[key] = ' '.join(location.split())
+                for term in terms:
+                    bisect.insort(self._terms, term)
+            elif count <= 0 and key in self._counts:
+                del self._display[key]
+                for term in terms:
+                    del self._terms[bisect.bisect_left(self._terms, term)]
+            if count > 0:
+                self._counts[key] = count
+            else:
+                self._counts.pop(key, None)
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._counts = None
+
+
+locations = LocationIndex()
+
+
+def move_listing(old, new):
+    """Apply a listing moving from `old` to `new`, each a (location, is_active) pair or None"""
+    if old == new:
+        return
+    if old and old[1]:
+        locations.add(old[0], -1)
+    if new and new[1]:
+        locations.add(new[0], 1)
+
+
+@receiver(post_save, sender=Property)
+def property_saved(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not {'location', 'is_active'} & set(update_fields)):
+        return
+    old = None if created else getattr(instance, '_loaded_listing', None)
+    new = (instance.location, instance.is_active)
+    instance._loaded_listing = new
+    if not created and (old is None or None in old):
+        # Loaded without these fields; the previous location is unknown
+        transaction.on_commit(locations.invalidate)
+        return
+    transaction.on_commit(lambda: move_listing(old, new))
+
+
+@receiver(post_delete, sender=Property)
+def property_deleted(sender, instance, **kwargs):
+    old = getattr(instance, '_loaded_listing', None) or (
+        instance.__dict__.get('location'), instance.__dict__.get('is_active'),
+    )
+    if None in old:
+        transaction.on_commit(locations.invalidate)
+        return
+    transaction.on_commit(lambda: move_listing(old, None))
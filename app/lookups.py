@@ -0,0 +1,58 @@
+"""
+In-process lookup tables for small, rarely changing reference data.
+
+Rows are loaded with a single query on first use and reused by every request
+in the process. Local saves and deletes invalidate the table through model
+signals; the TTL bounds staleness for changes made by other processes.
+"""
+import threading
+import time
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import PropertyType
+
+
+class PropertyTypeTable:
+    ttl = 300
+
+    def __init__(self):
+        self._rows = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        from .serializers import PropertyTypeSerializer
+
+        types = PropertyType.objects.all()
+        return {row['id']: row for row in PropertyTypeSerializer(types, many=True).data}
+
+    def rows(self):
+        """Return {id: serialized PropertyType} for every property type"""
+        rows = self._rows
+        if rows is None or time.monotonic() - self._loaded_at > self.ttl:
+            with self._lock:
+                rows = self._load()
+                self._rows, self._loaded_at = rows, time.monotonic()
+        return rows
+
+    def get_many(self, ids):
+        rows = self.rows()
+        if any(pk not in rows for pk in ids):
+            # Created in another process since the table was loaded
+            self.invalidate()
+            rows = self.rows()
+        return [rows[pk] for pk in ids if pk in rows]
+
+    def invalidate(self):
+        with self._lock:
+            self._rows = None
+
+
+property_types = PropertyTypeTable()
+
+
+@receiver([post_save, post_delete], sender=PropertyType)
+def invalidate_property_types(sender, **kwargs):
+    property_types.invalidate()
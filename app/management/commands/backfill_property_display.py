@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from app.display import backfill
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored display fields of properties written without save()'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows read and updated per batch')
+
+    def handle(self, *args, **options):
+        updated = backfill(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Updated display fields of {updated} properties'))
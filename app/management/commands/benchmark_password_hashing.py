@@ -0,0 +1,47 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import hashers
+from django.core.management.base import BaseCommand
+
+from app import passwords
+
+
+class Command(BaseCommand):
+    help = 'Measure password verifications (logins) per second per core through the hashing pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200, help='Number of password checks to run')
+        parser.add_argument('--concurrency', type=int, default=32, help='Simulated concurrent request threads')
+
+    def handle(self, *args, **options):
+        logins = options['logins']
+        concurrency = options['concurrency']
+        cores = os.cpu_count() or 1
+        config = passwords.get_hashing_config()
+        encoded = hashers.make_password('benchmark-password')
+
+        self.stdout.write(
+            f"pool={config['POOL'] or 'inline'} cores={cores} "
+            f"iterations={hashers.get_hasher().iterations} logins={logins} concurrency={concurrency}"
+        )
+
+        # Warm up the pool so worker start-up isn't measured
+        passwords.verify_password('benchmark-password', encoded)
+
+        def login(_):
+            is_correct, _must_update = passwords.verify_password('benchmark-password', encoded)
+            assert is_correct
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as request_threads:
+            list(request_threads.map(login, range(logins)))
+        elapsed = time.perf_counter() - start
+
+        rate = logins / elapsed
+        self.stdout.write(self.style.SUCCESS(
+            f'{rate:.1f} logins/sec total, {rate / cores:.1f} logins/sec/core '
+            f'({elapsed * 1000 / logins:.1f} ms per login wall clock)'
+        ))
+        passwords.shutdown_executor()
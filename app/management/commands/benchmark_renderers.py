@@ -0,0 +1,85 @@
+import io
+import time
+
+from django.db import connections
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from app import datasets
+from app.models import Property, User
+from app.renderers import ORJSONParser, ORJSONRenderer, orjson
+from app.serializers import PropertySerializer
+from app.views import AdminAnalyticsView
+
+
+class Command(BaseCommand):
+    help = 'Compare DRF\'s JSONRenderer/JSONParser with the orjson ones on property listing and analytics payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--properties', type=int, default=2000, help='Listings in the generated dataset')
+        parser.add_argument('--use-existing', action='store_true',
+                            help='Run against the configured database as-is instead of a fresh test database')
+        parser.add_argument('--rounds', type=int, default=5, help='Timed rounds per renderer; the best is reported')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson is not installed (pip install orjson)')
+        connection = connections['default']
+        old_name = None
+        if not options['use_existing']:
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            datasets.generate(options['properties'], seed=0)
+        try:
+            self.run(options['rounds'])
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def payloads(self):
+        factory = APIRequestFactory()
+        context = {'request': Request(factory.get('/api/properties/'))}
+        listing = Property.objects.filter(is_active=True).select_related('property_type').prefetch_related('images')
+        yield 'property listing', PropertySerializer(listing, many=True, context=context).data
+
+        admin = User.objects.filter(role='admin').first() or User.objects.create_user(
+            'benchmark-admin', 'benchmark-admin@example.com', None, role='admin',
+        )
+        request = factory.get('/api/admin/analytics/')
+        force_authenticate(request, admin)
+        response = AdminAnalyticsView.as_view()(request)
+        if response.status_code != 200:
+            raise CommandError(f'AdminAnalyticsView returned {response.status_code}')
+        yield 'admin analytics', response.data
+
+    def run(self, rounds):
+        for name, data in self.payloads():
+            expected = JSONRenderer().render(data)
+            if ORJSONRenderer().render(data) != expected:
+                raise CommandError(f'{name}: ORJSONRenderer output differs from JSONRenderer')
+            if ORJSONParser().parse(io.BytesIO(expected)) != JSONParser().parse(io.BytesIO(expected)):
+                raise CommandError(f'{name}: ORJSONParser result differs from JSONParser')
+
+            self.stdout.write(f'{name}: {len(expected) / 1024:.0f} KB, output identical')
+            for action, stdlib, fast in (
+                ('render', lambda: JSONRenderer().render(data), lambda: ORJSONRenderer().render(data)),
+                ('parse', lambda: JSONParser().parse(io.BytesIO(expected)),
+                 lambda: ORJSONParser().parse(io.BytesIO(expected))),
+            ):
+                stdlib_time, fast_time = self.best(stdlib, rounds), self.best(fast, rounds)
+                self.stdout.write(
+                    f'  {action:<7} json {stdlib_time * 1000:>8.2f} ms  orjson {fast_time * 1000:>8.2f} ms  '
+                    f'{stdlib_time / fast_time:.1f}x'
+                )
+
+    @staticmethod
+    def best(func, rounds):
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
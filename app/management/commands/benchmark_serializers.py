@@ -0,0 +1,78 @@
+import time
+
+from django.db import connections
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from app import datasets
+from app.compiled import compiled_serializer
+from app.models import Property
+from app.serializers import PropertySerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec of PropertySerializer and its compiled plan on the property listing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--properties', type=int, default=2000, help='Listings in the generated dataset')
+        parser.add_argument('--use-existing', action='store_true',
+                            help='Run against the configured database as-is instead of a fresh test database')
+        parser.add_argument('--rounds', type=int, default=5, help='Timed rounds per path; the best is reported')
+
+    def handle(self, *args, **options):
+        connection = connections['default']
+        old_name = None
+        if not options['use_existing']:
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            datasets.generate(options['properties'], seed=0)
+        try:
+            self.run(options['rounds'])
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, rounds):
+        context = {'request': Request(APIRequestFactory().get('/api/properties/'))}
+        compiled = compiled_serializer(PropertySerializer)
+        queryset = Property.objects.filter(is_active=True).select_related('property_type').prefetch_related(
+            'images'
+        ).order_by('-created_at', '-id')
+        instances, rows = list(queryset), list(compiled.values(queryset))
+        if not instances:
+            raise CommandError('No active properties to serialize')
+
+        expected = JSONRenderer().render(PropertySerializer(instances, many=True, context=context).data)
+        if JSONRenderer().render(compiled.serialize(rows, context)) != expected:
+            raise CommandError('Compiled output differs from PropertySerializer')
+
+        paths = {
+            # Serialization of rows already in memory
+            'serialize': (
+                lambda: PropertySerializer(instances, many=True, context=context).data,
+                lambda: compiled.serialize(rows, context),
+            ),
+            # Queries, row construction and serialization, as the list endpoint runs them
+            'query+serialize': (
+                lambda: PropertySerializer(queryset.all(), many=True, context=context).data,
+                lambda: compiled.serialize(compiled.values(queryset), context),
+            ),
+        }
+        self.stdout.write(f'{len(instances)} rows, output identical')
+        for name, (drf, fast) in paths.items():
+            drf_rate, fast_rate = self.rate(drf, len(instances), rounds), self.rate(fast, len(instances), rounds)
+            self.stdout.write(
+                f'{name:<16} serializer {drf_rate:>10.0f} rows/s  compiled {fast_rate:>10.0f} rows/s  '
+                f'{fast_rate / drf_rate:.1f}x'
+            )
+
+    @staticmethod
+    def rate(func, rows, rounds):
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return rows / best
@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.db import get_sqlite_pragmas, sqlite_pragma_statements
+
+
+# Stock Django/SQLite behaviour: rollback journal, deferred transactions
+STOCK_PROFILE = {
+    'pragmas': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+    'begin': 'BEGIN',
+    'timeout': 5,
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare SQLite reader/writer throughput with stock settings and the tuned SQLITE_PRAGMAS profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per profile')
+        parser.add_argument('--rows', type=int, default=20000, help='Rows in the listing table')
+
+    def handle(self, *args, **options):
+        tuned = {
+            'pragmas': get_sqlite_pragmas(),
+            'begin': 'BEGIN IMMEDIATE',
+            'timeout': 5,
+        }
+        for name, profile in (('stock', STOCK_PROFILE), ('tuned', tuned)):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                self.seed(path, options['rows'])
+                result = self.run(path, profile, options)
+            self.stdout.write(
+                f"{name:<6} reads/s {result['reads'] / options['duration']:>10.1f}  "
+                f"writes/s {result['writes'] / options['duration']:>8.1f}  "
+                f"locked errors {result['locked']}"
+            )
+
+    def seed(self, path, rows):
+        db = sqlite3.connect(path)
+        db.execute('CREATE TABLE listing (id INTEGER PRIMARY KEY, location TEXT, price INTEGER, title TEXT)')
+        db.execute('CREATE TABLE contact (id INTEGER PRIMARY KEY, listing_id INTEGER, message TEXT, created REAL)')
+        db.executemany(
+            'INSERT INTO listing (location, price, title) VALUES (?, ?, ?)',
+            ((f'location-{i % 50}', i * 1000, f'Listing {i}') for i in range(rows)),
+        )
+        db.commit()
+        db.close()
+
+    def connect(self, path, profile):
+        db = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None, check_same_thread=False)
+        for statement in sqlite_pragma_statements(profile['pragmas']):
+            db.execute(statement)
+        return db
+
+    def run(self, path, profile, options):
+        counts = {'reads': 0, 'writes': 0, 'locked': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def reader(index):
+            db = self.connect(path, profile)
+            done = 0
+            while time.monotonic() < deadline:
+                db.execute(
+                    'SELECT id, title, price FROM listing WHERE location = ? ORDER BY price DESC LIMIT 10',
+                    (f'location-{(index + done) % 50}',),
+                ).fetchall()
+                done += 1
+            with lock:
+                counts['reads'] += done
+            db.close()
+
+        def writer(index):
+            db = self.connect(path, profile)
+            done = locked = 0
+            while time.monotonic() < deadline:
+                try:
+                    # Read-then-write, like validating a foreign key before inserting
+                    db.execute(profile['begin'])
+                    db.execute('SELECT id FROM listing WHERE id = ?', (done % 1000 + 1,)).fetchone()
+                    db.execute(
+                        'INSERT INTO contact (listing_id, message, created) VALUES (?, ?, ?)',
+                        (done % 1000 + 1, 'Benchmark message', time.time()),
+                    )
+                    db.execute('COMMIT')
+                    done += 1
+                except sqlite3.OperationalError as e:
+                    if db.in_transaction:
+                        db.execute('ROLLBACK')
+                    if 'locked' not in str(e) and 'busy' not in str(e):
+                        raise
+                    locked += 1
+            with lock:
+                counts['writes'] += done
+                counts['locked'] += locked
+            db.close()
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(options['readers'])]
+        threads += [threading.Thread(target=writer, args=(i,)) for i in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts
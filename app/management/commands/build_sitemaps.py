@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from app.sitemaps import build, get_sitemaps_config
+
+
+class Command(BaseCommand):
+    help = 'Write sitemap.xml, the property and news sitemaps and their RSS/Atom feeds, rewriting only changed files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rewrite every file, changed or not')
+
+    def handle(self, *args, **options):
+        result = build(force=options['force'])
+        for path in result['written']:
+            self.stdout.write(f'wrote {path}')
+        for path in result['removed']:
+            self.stdout.write(f'removed {path}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(result["written"])} written, {len(result["removed"])} removed in {get_sitemaps_config()["ROOT"]}'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.display import stale_properties
+
+
+class Command(BaseCommand):
+    help = 'Report properties whose stored display fields no longer match their source fields'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--show', type=int, default=10, help='Stale rows to print in detail')
+
+    def handle(self, *args, **options):
+        stale = 0
+        for row, differences in stale_properties():
+            stale += 1
+            if stale <= options['show']:
+                for name, (stored, expected) in differences.items():
+                    self.stdout.write(f'Property {row.pk}: {name} is {stored!r}, expected {expected!r}')
+        if stale:
+            raise CommandError(f'{stale} properties have stale display fields; run backfill_property_display')
+        self.stdout.write(self.style.SUCCESS('All property display fields are up to date'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from app.sync import get_sync_config, prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete delta-sync tombstones older than SYNC["TOMBSTONE_DAYS"]'
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} tombstones older than {get_sync_config()['TOMBSTONE_DAYS']} days")
+        )
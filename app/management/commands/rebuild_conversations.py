@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app.conversations import rebuild_conversations
+
+
+class Command(BaseCommand):
+    help = 'File messages without a conversation and recompute every conversation\'s counters'
+
+    def handle(self, *args, **options):
+        filed = rebuild_conversations()
+        self.stdout.write(self.style.SUCCESS(f'Filed {filed} messages into conversations'))
@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from app import benchmarks, datasets
+
+
+class Command(BaseCommand):
+    help = 'Run the in-process API benchmark suite and report throughput and latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', choices=sorted(datasets.SIZES), default='1k',
+                            help='Synthetic dataset size to generate in a temporary test database')
+        parser.add_argument('--use-existing', action='store_true',
+                            help='Run against the configured database as-is instead of a fresh test database')
+        parser.add_argument('--scenarios', nargs='+', choices=sorted(benchmarks.SCENARIOS),
+                            default=list(benchmarks.SCENARIOS))
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario')
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Client threads per scenario (SQLite test databases work best with 1)')
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--compare', help='Baseline JSON report to compare against')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read baseline report: {e}")
+
+        connection = connections['default']
+        old_name = None
+        if not options['use_existing']:
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            self.stdout.write(f"Generating {options['dataset']} dataset...")
+            datasets.generate(datasets.SIZES[options['dataset']], seed=options['seed'], log=self.stdout.write)
+
+        try:
+            report = benchmarks.run(
+                options['scenarios'], requests=options['requests'], concurrency=options['concurrency'],
+                warmup=options['warmup'], seed=options['seed'], log=self.stdout.write,
+            )
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report['dataset'] = 'existing' if options['use_existing'] else options['dataset']
+        if baseline is not None:
+            report['comparison'] = benchmarks.compare(report, baseline)
+            for name, deltas in report['comparison'].items():
+                change = {metric: 'n/a' if delta is None else f'{delta:+}%' for metric, delta in deltas.items()}
+                self.stdout.write(
+                    f"{name:<18} throughput {change['throughput_rps']}  p95 {change['p95_ms']}  "
+                    f"p99 {change['p99_ms']} vs {baseline.get('commit')}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
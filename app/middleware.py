@@ -0,0 +1,270 @@
+import json
+import logging
+import time
+import types
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .compression import apply_max_age, compress_response
+from .perf import get_perf_config, registry
+from .profiling import store as profile_store
+from .queries import QueryBudgetExceeded, QueryTimer, describe, record_queries, wrap_connections
+from .routers import get_replica_config, is_sticky, mark_sticky, routing
+
+
+logger = logging.getLogger('app.queries')
+perf_logger = logging.getLogger('app.perf')
+
+
+def get_view_class(view_func):
+    # DRF views expose `cls`, Django class-based views `view_class`
+    return getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+
+
+class HybridMiddleware:
+    """
+    Base for middleware that runs natively under both WSGI and ASGI, so async
+    views never hop to a worker thread for it.
+
+    Subclasses implement `begin(request, stack)`, entering on `stack` any
+    context that must span the rest of the request, and `end(request,
+    response, state)` with whatever `begin` returned. Hooks such as
+    process_view stay plain methods and must not block.
+    """
+    sync_capable = True
+    async_capable = True
+    hooks = ('process_view', 'process_template_response')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+            for name in self.hooks:
+                hook = getattr(self, name, None)
+                if hook is not None:
+                    setattr(self, name, self.async_hook(hook))
+
+    def async_hook(self, hook):
+        async def wrapper(middleware, *args):
+            return hook(*args)
+        # Bound, as Django reads hook.__self__ to name the middleware in errors
+        return types.MethodType(wrapper, self)
+
+    def begin(self, request, stack):
+        return None
+
+    def end(self, request, response, state):
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with ExitStack() as stack:
+            state = self.begin(request, stack)
+            response = self.get_response(request)
+        return self.end(request, response, state)
+
+    async def __acall__(self, request):
+        with ExitStack() as stack:
+            state = self.begin(request, stack)
+            response = await self.get_response(request)
+        return self.end(request, response, state)
+
+
+class QueryInspectorMiddleware(HybridMiddleware):
+    """
+    Development/test middleware that records the queries issued by each request.
+
+    Views may declare `query_budget = <max queries>`. Requests that exceed it, or
+    that repeat a SELECT shape at least N_PLUS_ONE_THRESHOLD times, are logged
+    with the serializer field responsible. Views that legitimately repeat a
+    query a fixed number of times can raise the threshold with
+    `n_plus_one_threshold`. With STRICT enabled the request fails
+    with QueryBudgetExceeded instead, which makes the test client raise.
+    """
+
+    @staticmethod
+    def get_config():
+        config = {'ENABLED': settings.DEBUG, 'STRICT': False, 'N_PLUS_ONE_THRESHOLD': 3}
+        config.update(getattr(settings, 'QUERY_INSPECTOR', {}))
+        return config
+
+    def begin(self, request, stack):
+        config = self.get_config()
+        if not config['ENABLED']:
+            return None
+        return config, stack.enter_context(record_queries())
+
+    def end(self, request, response, state):
+        if state is None:
+            return response
+        config, recorder = state
+        report = recorder.report(getattr(request, 'n_plus_one_threshold', None) or config['N_PLUS_ONE_THRESHOLD'])
+        budget = getattr(request, 'query_budget', None)
+        response.query_report = report
+        response['X-Query-Count'] = str(report['count'])
+
+        problems = []
+        if budget is not None and report['count'] > budget:
+            problems.append(f"{report['count']} queries exceed the budget of {budget}")
+        if report['n_plus_one']:
+            problems.append('N+1 query pattern detected:\n' + describe(report))
+        if problems:
+            message = f'{request.method} {request.path}: ' + '\n'.join(problems)
+            if config['STRICT']:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = get_view_class(view_func)
+        request.query_budget = getattr(view_class, 'query_budget', None)
+        request.n_plus_one_threshold = getattr(view_class, 'n_plus_one_threshold', None)
+
+
+class CompressionMiddleware(HybridMiddleware):
+    """
+    gzip/brotli for text and JSON responses, negotiated through Accept-Encoding
+    (see app.compression). Place it right after RequestTimingMiddleware so
+    everything else sees the uncompressed body. Views with a `cache_max_age`
+    attribute get it as a public max-age, which lets their compressed
+    bodies be cached.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.cache_max_age = getattr(get_view_class(view_func), 'cache_max_age', None)
+
+    def end(self, request, response, state):
+        apply_max_age(request, response, getattr(request, 'cache_max_age', None))
+        return compress_response(request, response)
+
+
+class RequestTimingMiddleware(HybridMiddleware):
+    """
+    Records per-request timings: total, DB time and query count, view time
+    (view code excluding DB, i.e. mostly serializer .data), render time (JSON
+    encoding) and response size. Results go to the `Server-Timing` header, a
+    JSON line on the `app.perf` logger and the rolling histograms served by
+    /api/admin/perf/. Should be the outermost middleware.
+    """
+
+    def begin(self, request, stack):
+        config = get_perf_config()
+        if not config['ENABLED']:
+            return None
+        timer = stack.enter_context(wrap_connections(QueryTimer()))
+        request._perf = {'timer': timer, 'view_start': None, 'view_end': None, 'render_end': None}
+        return config, time.perf_counter()
+
+    def end(self, request, response, state):
+        if state is None:
+            return response
+        config, start = state
+        end = time.perf_counter()
+
+        timings = self.collect(request, response, start, end)
+        registry.record(timings['endpoint'], timings)
+        if config['SERVER_TIMING']:
+            response['Server-Timing'] = (
+                f"total;dur={timings['total_ms']}, "
+                f"db;dur={timings['db_ms']};desc=\"{timings['queries']} queries\", "
+                f"view;dur={timings['view_ms']}, render;dur={timings['render_ms']}"
+            )
+        if config['LOG']:
+            perf_logger.info(json.dumps(timings))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        perf = getattr(request, '_perf', None)
+        if perf is not None:
+            perf['view_start'] = (time.perf_counter(), perf['timer'].duration)
+
+    def process_template_response(self, request, response):
+        # Runs right before DRF renders the response
+        perf = getattr(request, '_perf', None)
+        if perf is not None:
+            perf['view_end'] = (time.perf_counter(), perf['timer'].duration)
+
+            def rendered(response):
+                perf['render_end'] = time.perf_counter()
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def collect(request, response, start, end):
+        perf = request._perf
+        match = request.resolver_match
+        view_ms = render_ms = 0.0
+        if perf['view_start'] is not None:
+            view_start, db_at_start = perf['view_start']
+            view_end, db_at_end = perf['view_end'] or (end, perf['timer'].duration)
+            view_ms = ((view_end - view_start) - (db_at_end - db_at_start)) * 1000
+        if perf['view_end'] and perf['render_end']:
+            render_ms = (perf['render_end'] - perf['view_end'][0]) * 1000
+        return {
+            'endpoint': f"{request.method} {match.view_name if match else 'unresolved'}",
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round((end - start) * 1000, 3),
+            'db_ms': round(perf['timer'].duration * 1000, 3),
+            'queries': perf['timer'].count,
+            'view_ms': round(max(view_ms, 0.0), 3),
+            'render_ms': round(render_ms, 3),
+            'bytes': 0 if response.streaming else len(response.content),
+        }
+
+
+class ProfilingMiddleware(HybridMiddleware):
+    """
+    Profiles requests armed by app.profiling (enabled endpoint or X-Profile
+    header) and keeps those slower than the configured threshold.
+    """
+
+    def end(self, request, response, state):
+        profiling = getattr(request, '_profiling', None)
+        if profiling is not None:
+            entry = profile_store.finish(request, *profiling)
+            if entry is not None:
+                response['X-Profile-Id'] = str(entry['id'])
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        if profile_store.should_profile(request, view_name):
+            started = profile_store.start()
+            if started is not None:
+                request._profiling = (view_name, *started)
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """
+    Let read-only views read from a replica (see app.routers).
+
+    Views opt in with `use_read_replica = True`. A request that writes marks
+    its client sticky, so that client's next requests read from the primary
+    until the replicas have caught up.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def begin(self, request, stack):
+        if not get_replica_config()['DATABASES']:
+            return None
+        request.db_routing = stack.enter_context(routing())
+        return request.db_routing
+
+    def end(self, request, response, state):
+        if state is not None and state.wrote:
+            mark_sticky(request)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = getattr(request, 'db_routing', None)
+        if state is None or request.method not in self.SAFE_METHODS:
+            return None
+        if getattr(get_view_class(view_func), 'use_read_replica', False) and not is_sticky(request):
+            state.read_replica = True
+        return None
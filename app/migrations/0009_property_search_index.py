@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+INDEX_NAME = 'property_search_gin_idx'
+
+
+def search_index():
+    from django.contrib.postgres.indexes import GinIndex
+
+    from app.search import property_search_vector
+
+    return GinIndex(property_search_vector(), name=INDEX_NAME)
+
+
+def create_search_index(apps, schema_editor):
+    # Full-text search index; only PostgreSQL has tsvector/GIN, other backends search with LIKE
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Property = apps.get_model('app', 'Property')
+    schema_editor.add_index(Property, search_index())
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Property = apps.get_model('app', 'Property')
+    schema_editor.remove_index(Property, search_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_property_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_property_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=30)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='propertyalert',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='propertyinquiry',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='propertyvisit',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='savedproperty',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='customerdocument',
+            index=models.Index(fields=['customer', 'updated_at'], name='document_customer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customermessage',
+            index=models.Index(fields=['customer', 'updated_at'], name='message_customer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyalert',
+            index=models.Index(fields=['customer', 'updated_at'], name='alert_customer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyinquiry',
+            index=models.Index(fields=['customer', 'updated_at'], name='inquiry_customer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyvisit',
+            index=models.Index(fields=['customer', 'updated_at'], name='visit_customer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedproperty',
+            index=models.Index(fields=['customer', 'updated_at'], name='saved_customer_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='synctombstone',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='synctombstone',
+            index=models.Index(fields=['customer', 'collection', 'deleted_at'], name='tombstone_customer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='synctombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def file_existing_messages(apps, schema_editor):
+    from app.conversations import rebuild_conversations
+
+    rebuild_conversations(apps.get_model('app', 'Conversation'), apps.get_model('app', 'CustomerMessage'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_customer_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=200)),
+                ('last_activity_at', models.DateTimeField()),
+                ('message_count', models.PositiveIntegerField(default=0)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('agent_unread_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('agent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to='app.agent')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to=settings.AUTH_USER_MODEL)),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app.customermessage')),
+                ('property', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='app.property')),
+            ],
+            options={
+                'verbose_name': 'Conversation',
+                'verbose_name_plural': 'Conversations',
+                'ordering': ['-last_activity_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='customermessage',
+            name='conversation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='app.conversation'),
+        ),
+        migrations.AddIndex(
+            model_name='customermessage',
+            index=models.Index(fields=['conversation', '-created_at'], name='message_conversation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['customer', '-last_activity_at'], name='conversation_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['customer', 'updated_at'], name='conversation_updated_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('customer', 'agent', 'property'), name='conversation_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(condition=models.Q(('property__isnull', True)), fields=('customer', 'agent'), name='conversation_unique_no_property'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(condition=models.Q(('agent__isnull', True)), fields=('customer', 'property'), name='conversation_unique_no_agent'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(condition=models.Q(('agent__isnull', True), ('property__isnull', True)), fields=('customer',), name='conversation_unique_customer_only'),
+        ),
+        migrations.RunPython(file_existing_messages, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:22
+
+from django.db import migrations, models
+
+
+def store_display_fields(apps, schema_editor):
+    from app.display import backfill
+
+    backfill(apps.get_model('app', 'Property'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_conversations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='area_in_sqft',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='formatted_area',
+            field=models.CharField(default='Area not specified', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='formatted_land_area',
+            field=models.CharField(editable=False, max_length=60, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='google_maps_embed_src',
+            field=models.TextField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='land_area_display',
+            field=models.CharField(editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='purpose_display',
+            field=models.CharField(default='Not specified', editable=False, max_length=50),
+        ),
+        migrations.RunPython(store_display_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:35
+
+from django.db import migrations, models
+
+
+def store_covers(apps, schema_editor):
+    from app.covers import refresh_covers
+
+    refresh_covers(apps.get_model('app', 'Property').objects.all(), apps.get_model('app', 'PropertyImage'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_property_display_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='cover_image',
+            field=models.ImageField(blank=True, editable=False, upload_to='properties/'),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='image_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(store_covers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_property_covers'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='galleryimage',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['gallery', 'order', 'created_at'], name='galleryimage_listing_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:40
+
+from django.db import migrations, models
+
+
+def store_excerpts(apps, schema_editor):
+    from app.models import news_excerpt
+
+    News = apps.get_model('app', 'News')
+    articles = list(News.objects.only('excerpt', 'content'))
+    for article in articles:
+        article.listing_excerpt = news_excerpt(article)
+    News.objects.bulk_update(articles, ['listing_excerpt'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_gallery_image_listing_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='listing_excerpt',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_at'], name='news_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(condition=models.Q(('is_featured', True), ('is_published', True)), fields=['-published_at'], name='news_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', '-published_at'], name='news_category_idx'),
+        ),
+        migrations.RunPython(store_excerpts, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,16 @@
-from django.db import models
+import html
+import re
+from decimal import Decimal
+
+from django.db import models, router, transaction
+from django.db.models import F, Q
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.core.validators import RegexValidator
 from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+from .passwords import ahash_password, averify_password, hash_password, verify_password
 
 
 class UserManager(BaseUserManager):
@@ -70,6 +79,27 @@ class User(AbstractBaseUser, PermissionsMixin):
     def get_short_name(self):
         return self.first_name
 
+    def set_password(self, raw_password):
+        """Hash on the shared hashing pool (see app.passwords)"""
+        self.password = hash_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        is_correct, must_update = verify_password(raw_password, self.password)
+        if is_correct and must_update:
+            self.set_password(raw_password)
+            # Password hash upgrades shouldn't be considered password changes.
+            self._password = None
+            self.save(update_fields=['password'])
+        return is_correct
+
+    async def acheck_password(self, raw_password):
+        is_correct, must_update = await averify_password(raw_password, self.password)
+        if is_correct and must_update:
+            self.password = await ahash_password(raw_password)
+            await self.asave(update_fields=['password'])
+        return is_correct
+
 
 class Organization(models.Model):
     name = models.CharField(max_length=100)
@@ -159,80 +189,110 @@ class Property(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Display values derived from the fields above, stored by save(); see property_display_fields
+    formatted_area = models.CharField(max_length=100, default='Area not specified', editable=False)
+    purpose_display = models.CharField(max_length=50, default='Not specified', editable=False)
+    formatted_land_area = models.CharField(max_length=60, null=True, editable=False)
+    land_area_display = models.CharField(max_length=100, null=True, editable=False)
+    area_in_sqft = models.FloatField(default=0.0, editable=False)
+    google_maps_embed_src = models.TextField(null=True, editable=False)
+
+    # Listing card summary of the images, kept current by app.covers as images change
+    cover_image = models.ImageField(upload_to='properties/', blank=True, editable=False)
+    image_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         verbose_name = 'Property'
         verbose_name_plural = 'Properties'
+        indexes = [
+            # Public listing: active properties, newest first, optionally by type or price range
+            models.Index(fields=['is_active', '-created_at'], name='property_active_created_idx'),
+            models.Index(fields=['is_active', 'property_type'], name='property_active_type_idx'),
+            models.Index(fields=['price'], name='property_price_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
-    @property
-    def formatted_area(self):
-        """Return formatted area with unit"""
-        if self.area is None:
-            return "Area not specified"
-        unit_display = dict(self.AREA_UNIT_CHOICES).get(self.area_unit, self.area_unit or 'unit')
-        return f"{self.area} {unit_display}"
-
-    @property
-    def purpose_display(self):
-        """Return human-readable purpose"""
-        return dict(self.PURPOSE_CHOICES).get(self.property_purpose, self.property_purpose or 'Not specified')
-
-    @property
-    def formatted_land_area(self):
-        """Return formatted land area in Ropani-Aana-Paisa-Daam format"""
-        if any([self.land_ropani, self.land_aana, self.land_paisa, self.land_daam]):
-            ropani = self.land_ropani or 0
-            aana = self.land_aana or 0
-            paisa = self.land_paisa or 0
-            daam = self.land_daam or 0
-            return f"{ropani}-{aana}-{paisa}-{daam}"
-        return None
-
-    @property
-    def land_area_display(self):
-        """Return human-readable land area"""
-        if any([self.land_ropani, self.land_aana, self.land_paisa, self.land_daam]):
-            parts = []
-            if self.land_ropani:
-                parts.append(f"{self.land_ropani} Ropani")
-            if self.land_aana:
-                parts.append(f"{self.land_aana} Aana")
-            if self.land_paisa:
-                parts.append(f"{self.land_paisa} Paisa")
-            if self.land_daam:
-                parts.append(f"{self.land_daam} Daam")
-            return ", ".join(parts)
-        return None
-
-    @property
-    def area_in_sqft(self):
-        """Convert area to square feet for calculations"""
-        if self.area is None:
-            return 0.0
-        conversion_rates = {
-            'aana': 342.25,
-            'ropani': 5476,  # 16 aana
-            'dhur': 273.8,   # 1/20 ropani
-            'bigha': 72900,  # 20 kattha
-            'kattha': 3645,  # 20 dhur
-        }
-        return float(self.area) * conversion_rates.get(self.area_unit, 1)
-
-    @property
-    def google_maps_embed_src(self):
-        """Extract src URL from Google Maps embed iframe"""
-        if self.google_maps_embed_url:
-            # Extract src from iframe if full iframe is provided
-            if 'iframe' in self.google_maps_embed_url.lower():
-                import re
-                src_match = re.search(r'src="([^"]*)"', self.google_maps_embed_url)
-                if src_match:
-                    return src_match.group(1)
-            # Return as is if it's already a URL
-            return self.google_maps_embed_url
-        return None
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Where the row was listed, for app.locations to move it from on save
+        instance._loaded_listing = (instance.__dict__.get('location'), instance.__dict__.get('is_active'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            # The cover fields belong to image writes; saving a stale instance must not revert them.
+            # Deferred fields are left alone, as Model.save does, except auto_now ones, which need no value.
+            deferred = self.get_deferred_fields()
+            update_fields = kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COVER_FIELDS
+                and (field.attname not in deferred or getattr(field, 'auto_now', False))
+            ]
+        if update_fields is None or not DISPLAY_SOURCES.isdisjoint(update_fields):
+            for name, value in property_display_fields(self).items():
+                setattr(self, name, value)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *DISPLAY_FIELDS}
+        super().save(*args, **kwargs)
+
+
+# Square feet per unit of area
+SQFT_PER_UNIT = {
+    'aana': 342.25,
+    'ropani': 5476,  # 16 aana
+    'dhur': 273.8,   # 1/20 ropani
+    'bigha': 72900,  # 20 kattha
+    'kattha': 3645,  # 20 dhur
+}
+AREA_UNIT_LABELS = dict(Property.AREA_UNIT_CHOICES)
+PURPOSE_LABELS = dict(Property.PURPOSE_CHOICES)
+AREA_PLACES = Property._meta.get_field('area').decimal_places
+EMBED_SRC = re.compile(r'src="([^"]*)"')
+
+# Stored display fields and the fields they are computed from
+DISPLAY_FIELDS = (
+    'formatted_area', 'purpose_display', 'formatted_land_area', 'land_area_display', 'area_in_sqft',
+    'google_maps_embed_src',
+)
+DISPLAY_SOURCES = frozenset((
+    'area', 'area_unit', 'property_purpose', 'land_ropani', 'land_aana', 'land_paisa', 'land_daam',
+    'google_maps_embed_url',
+))
+# Stored summary of a property's images; see app.covers
+COVER_FIELDS = ('cover_image', 'image_count')
+
+
+def property_display_fields(row):
+    """
+    The stored display fields of a Property, computed from its other fields.
+    `row` only needs Property's attributes, so historical models work too.
+    """
+    # Rendered as the database returns it, at the field's scale
+    area = None if row.area is None else Decimal(row.area).quantize(Decimal(1).scaleb(-AREA_PLACES))
+    land = [row.land_ropani, row.land_aana, row.land_paisa, row.land_daam]
+    land_parts = [f'{value} {unit}' for value, unit in zip(land, ('Ropani', 'Aana', 'Paisa', 'Daam')) if value]
+
+    embed_src = row.google_maps_embed_url or None
+    if embed_src and 'iframe' in embed_src.lower():
+        # Extract src from iframe if full iframe is provided
+        match = EMBED_SRC.search(embed_src)
+        if match:
+            embed_src = match.group(1)
+
+    return {
+        'formatted_area': 'Area not specified' if area is None else (
+            f"{area} {AREA_UNIT_LABELS.get(row.area_unit, row.area_unit or 'unit')}"
+        ),
+        'purpose_display': PURPOSE_LABELS.get(row.property_purpose, row.property_purpose or 'Not specified'),
+        'formatted_land_area': '-'.join(str(value or 0) for value in land) if any(land) else None,
+        'land_area_display': ', '.join(land_parts) if any(land) else None,
+        'area_in_sqft': 0.0 if area is None else float(area) * SQFT_PER_UNIT.get(row.area_unit, 1),
+        'google_maps_embed_src': embed_src,
+    }
 
 
 class PropertyImage(models.Model):
@@ -249,6 +309,13 @@ class PropertyImage(models.Model):
     def __str__(self):
         return f"Image for {self.property.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Moving an image changes the cover of the property it leaves too
+        instance._loaded_property_id = instance.__dict__.get('property_id')
+        return instance
+
 
 # Agent Management
 class Agent(models.Model):
@@ -308,10 +375,14 @@ class PropertyInquiry(models.Model):
     message = models.TextField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Property Inquiry'
         verbose_name_plural = 'Property Inquiries'
+        indexes = [
+            models.Index(fields=['customer', 'updated_at'], name='inquiry_customer_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Inquiry for {self.property.title} by {self.customer.username}"
@@ -331,10 +402,14 @@ class PropertyVisit(models.Model):
     scheduled_time = models.TimeField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='scheduled')
     notes = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Property Visit'
         verbose_name_plural = 'Property Visits'
+        indexes = [
+            models.Index(fields=['customer', 'updated_at'], name='visit_customer_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Visit to {self.property.title} on {self.scheduled_date}"
@@ -344,11 +419,15 @@ class SavedProperty(models.Model):
     customer = models.ForeignKey(User, on_delete=models.CASCADE)
     property = models.ForeignKey(Property, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ['customer', 'property']
         verbose_name = 'Saved Property'
         verbose_name_plural = 'Saved Properties'
+        indexes = [
+            models.Index(fields=['customer', 'updated_at'], name='saved_customer_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.customer.username} saved {self.property.title}"
@@ -433,10 +512,14 @@ class PropertyAlert(models.Model):
     max_bedrooms = models.IntegerField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Property Alert'
         verbose_name_plural = 'Property Alerts'
+        indexes = [
+            models.Index(fields=['customer', 'updated_at'], name='alert_customer_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Alert for {self.customer.username}"
@@ -473,6 +556,14 @@ class GalleryImage(models.Model):
         verbose_name = 'Gallery Image'
         verbose_name_plural = 'Gallery Images'
         ordering = ['order', 'created_at']
+        indexes = [
+            # A gallery's active images page by page (GalleryImageListView) and its cover
+            # Partial: SQLite tests booleans as a bare column, which an is_active key column cannot serve
+            models.Index(
+                fields=['gallery', 'order', 'created_at'], condition=models.Q(is_active=True),
+                name='galleryimage_listing_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.gallery.title} - {self.title or 'Image'}"
@@ -513,14 +604,50 @@ class News(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # The excerpt list pages show, stored by save(); see news_excerpt
+    listing_excerpt = models.TextField(default='', editable=False)
+
     class Meta:
         verbose_name = 'News Article'
         verbose_name_plural = 'News Articles'
         ordering = ['-published_at']
+        indexes = [
+            # Public list: published articles newest first, optionally featured only or by category.
+            # Partial for the same reason as galleryimage_listing_idx.
+            models.Index(fields=['-published_at'], condition=Q(is_published=True), name='news_published_idx'),
+            models.Index(
+                fields=['-published_at'], condition=Q(is_published=True, is_featured=True), name='news_featured_idx',
+            ),
+            models.Index(
+                fields=['category', '-published_at'], condition=Q(is_published=True), name='news_category_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or not {'excerpt', 'content'}.isdisjoint(update_fields):
+            self.listing_excerpt = news_excerpt(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'listing_excerpt'}
+        super().save(*args, **kwargs)
+
+
+EXCERPT_LENGTH = 300
+
+
+def news_excerpt(row):
+    """
+    The written excerpt, else the start of the content as plain text.
+    `row` only needs News' attributes, so historical models work too.
+    """
+    if row.excerpt:
+        return row.excerpt
+    text = ' '.join(html.unescape(strip_tags(row.content)).split())
+    return Truncator(text).chars(EXCERPT_LENGTH)
+
 
 class Team(models.Model):
     """Team member model for company staff"""
@@ -609,11 +736,93 @@ class Contact(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
+class ConversationManager(models.Manager):
+    def for_message(self, message):
+        conversation, _ = self.get_or_create(
+            customer_id=message.customer_id, agent_id=message.agent_id, property_id=message.property_id,
+            defaults={'subject': message.subject, 'last_activity_at': timezone.now()},
+        )
+        return conversation
+
+    def message_saved(self, message, created, was_read):
+        """Apply one message insert or read-state change to its conversation's counters"""
+        unread_field = 'agent_unread_count' if message.is_from_customer else 'unread_count'
+        changes = {}
+        if created:
+            changes['message_count'] = F('message_count') + 1
+            if not message.is_read:
+                changes[unread_field] = F(unread_field) + 1
+        elif was_read is not None and was_read != message.is_read:
+            changes[unread_field] = F(unread_field) + (-1 if message.is_read else 1)
+        if not changes:
+            return
+        conversations = self.filter(pk=message.conversation_id)
+        conversations.update(**changes, updated_at=timezone.now())
+        if created:
+            conversations.filter(last_activity_at__lte=message.created_at).update(
+                last_message=message, last_activity_at=message.created_at,
+            )
+
+
+class Conversation(models.Model):
+    """
+    A customer's thread with one agent about one property, with the inbox
+    fields denormalized. CustomerMessage.save keeps the counters current in
+    the same transaction; app.conversations.refresh_conversations recomputes
+    them from the messages.
+    """
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversations')
+    agent = models.ForeignKey(Agent, on_delete=models.CASCADE, related_name='conversations', null=True, blank=True)
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, null=True, blank=True)
+    subject = models.CharField(max_length=200)
+    last_message = models.ForeignKey(
+        'CustomerMessage', on_delete=models.SET_NULL, related_name='+', null=True, blank=True,
+    )
+    last_activity_at = models.DateTimeField()
+    message_count = models.PositiveIntegerField(default=0)
+    # Agent messages the customer has not read, and customer messages no agent has read
+    unread_count = models.PositiveIntegerField(default=0)
+    agent_unread_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ConversationManager()
+
+    class Meta:
+        verbose_name = 'Conversation'
+        verbose_name_plural = 'Conversations'
+        ordering = ['-last_activity_at']
+        # Agent and property are optional; NULLs never collide in a plain unique constraint
+        constraints = [
+            models.UniqueConstraint(fields=['customer', 'agent', 'property'], name='conversation_unique'),
+            models.UniqueConstraint(
+                fields=['customer', 'agent'], condition=Q(property__isnull=True), name='conversation_unique_no_property',
+            ),
+            models.UniqueConstraint(
+                fields=['customer', 'property'], condition=Q(agent__isnull=True), name='conversation_unique_no_agent',
+            ),
+            models.UniqueConstraint(
+                fields=['customer'], condition=Q(agent__isnull=True, property__isnull=True),
+                name='conversation_unique_customer_only',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['customer', '-last_activity_at'], name='conversation_inbox_idx'),
+            models.Index(fields=['customer', 'updated_at'], name='conversation_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.customer.username}: {self.subject[:50]}"
+
+
 class CustomerMessage(models.Model):
     """Messages between customers and agents"""
     customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='customer_messages')
     agent = models.ForeignKey(Agent, on_delete=models.CASCADE, related_name='agent_messages', null=True, blank=True)
     property = models.ForeignKey(Property, on_delete=models.CASCADE, null=True, blank=True)
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, related_name='messages', null=True, blank=True,
+    )
     subject = models.CharField(max_length=200)
     message = models.TextField()
     is_from_customer = models.BooleanField(default=True)
@@ -625,11 +834,35 @@ class CustomerMessage(models.Model):
         verbose_name = 'Customer Message'
         verbose_name_plural = 'Customer Messages'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer', 'updated_at'], name='message_customer_updated_idx'),
+            models.Index(fields=['conversation', '-created_at'], name='message_conversation_idx'),
+        ]
 
     def __str__(self):
         sender = self.customer.get_full_name() if self.is_from_customer else (self.agent.full_name if self.agent else 'System')
         return f"{sender}: {self.subject[:50]}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_read = instance.__dict__.get('is_read')
+        return instance
+
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        was_read = getattr(self, '_loaded_is_read', None)
+        if update_fields is not None and 'is_read' not in update_fields:
+            was_read = None
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            if self.conversation_id is None:
+                self.conversation = Conversation.objects.db_manager(using).for_message(self)
+            super().save(*args, **kwargs)
+            Conversation.objects.db_manager(using).message_saved(self, created, was_read)
+        self._loaded_is_read = self.is_read
+
 
 class CustomerDocument(models.Model):
     """Documents available to customers"""
@@ -656,6 +889,26 @@ class CustomerDocument(models.Model):
         verbose_name = 'Customer Document'
         verbose_name_plural = 'Customer Documents'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer', 'updated_at'], name='document_customer_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.customer.get_full_name()}"
+
+
+class SyncTombstone(models.Model):
+    """Records a deleted customer row so delta sync (app.sync) can report it"""
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    collection = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['customer', 'collection', 'deleted_at'], name='tombstone_customer_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.title} - {self.customer.get_full_name()}"
\ No newline at end of file
+        return f"{self.collection} #{self.object_id} deleted"
@@ -0,0 +1,82 @@
+"""
+In-process cache of news article detail responses.
+
+NewsDetailView serves an article from here after the first request for its
+slug in the process, so popular articles cost no queries. Saving or deleting
+any article or news category clears the whole cache through model signals:
+a category rename shows in every article of it, and news writes are rare.
+TTL bounds staleness for changes made by other processes.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import News, NewsCategory
+
+
+DEFAULT_CONFIG = {
+    'TTL': 300,
+    'MAX_ENTRIES': 1000,
+}
+
+
+def get_news_cache_config():
+    return {**DEFAULT_CONFIG, **getattr(settings, 'NEWS_CACHE', {})}
+
+
+class ArticleCache:
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by invalidate(), so a response loaded before a write is not stored after it
+        self.generation = 0
+
+    def get(self, key):
+        """The cached response data for `key`, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            data, stored_at = entry
+            if time.monotonic() - stored_at > get_news_cache_config()['TTL']:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def set(self, key, data, generation):
+        """Store `data` unless the cache was invalidated since `generation` was read"""
+        max_entries = get_news_cache_config()['MAX_ENTRIES']
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (data, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+articles = ArticleCache()
+
+
+def cache_key(request, slug):
+    # Image URLs in the payload are absolute, so they depend on the host asked for
+    return request.build_absolute_uri('/'), slug
+
+
+@receiver([post_save, post_delete], sender=News)
+@receiver([post_save, post_delete], sender=NewsCategory)
+def invalidate_articles(sender, **kwargs):
+    articles.invalidate()
+    # Again once the write is visible, in case a request reloaded the old row in between
+    transaction.on_commit(articles.invalidate)
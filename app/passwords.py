@@ -0,0 +1,105 @@
+"""
+Password hashing offloaded to a bounded worker pool.
+
+PBKDF2 is CPU bound. Running it on a bounded pool caps how many hashes run at
+once (by default one per core) so login bursts queue instead of
+oversubscribing the CPU and starving every other request. hashlib releases
+the GIL while hashing, so the default thread pool scales across cores without
+pickling overhead; a process pool can be selected instead.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class TunablePBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with the work factor taken from PASSWORD_HASHING['ITERATIONS']"""
+
+    @property
+    def iterations(self):
+        return get_hashing_config()['ITERATIONS'] or hashers.PBKDF2PasswordHasher.iterations
+
+
+DEFAULT_CONFIG = {
+    # 'thread', 'process' or None to hash inline on the request thread
+    'POOL': 'thread',
+    # Defaults to the number of CPU cores
+    'MAX_WORKERS': None,
+    # Defaults to Django's PBKDF2 iteration count
+    'ITERATIONS': None,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hashing_config():
+    return {**DEFAULT_CONFIG, **getattr(settings, 'PASSWORD_HASHING', {})}
+
+
+def _init_worker():
+    # Spawned worker processes need Django configured before using hashers
+    import django
+    django.setup()
+
+
+def get_executor():
+    """Return the shared hashing pool, or None when hashing runs inline"""
+    global _executor
+    config = get_hashing_config()
+    if not config['POOL']:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = config['MAX_WORKERS'] or os.cpu_count() or 1
+                if config['POOL'] == 'process':
+                    _executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker)
+                else:
+                    _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hash')
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+def _run(func, *args):
+    executor = get_executor()
+    if executor is None:
+        return func(*args)
+    return executor.submit(func, *args).result()
+
+
+def hash_password(raw_password):
+    """make_password() on the hashing pool"""
+    if raw_password is None:
+        # Unusable passwords are just a random string, no hashing involved
+        return hashers.make_password(None)
+    return _run(hashers.make_password, raw_password)
+
+
+def verify_password(raw_password, encoded):
+    """Return (is_correct, must_update), verified on the hashing pool"""
+    return _run(hashers.verify_password, raw_password, encoded)
+
+
+async def ahash_password(raw_password):
+    """hash_password() for async callers; the event loop is never blocked"""
+    if raw_password is None:
+        return hashers.make_password(None)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), hashers.make_password, raw_password)
+
+
+async def averify_password(raw_password, encoded):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), hashers.verify_password, raw_password, encoded)
@@ -0,0 +1,152 @@
+"""
+In-memory request timing statistics.
+
+Durations are recorded in microseconds into log-linear (HDR style) histograms:
+every power of two is split into 2**SUB_BUCKET_BITS linear buckets, so any
+recorded value is reported within ~3% while a histogram stays a few hundred
+integers regardless of traffic. Each endpoint keeps one histogram per time
+slot; percentiles merge the slots inside the rolling window.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+
+
+SUB_BUCKET_BITS = 5
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket_index(value):
+        shift = max(0, value.bit_length() - SUB_BUCKET_BITS)
+        return (shift << SUB_BUCKET_BITS) | (value >> shift)
+
+    @staticmethod
+    def bucket_upper(index):
+        shift = index >> SUB_BUCKET_BITS
+        return (((index & ((1 << SUB_BUCKET_BITS) - 1)) + 1) << shift) - 1
+
+    def record(self, value):
+        value = max(0, int(value))
+        self.counts[self.bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentiles(self, quantiles):
+        """Return {quantile: value} using the upper bound of each bucket"""
+        results = {}
+        if not self.count:
+            return {q: 0 for q in quantiles}
+        pending = sorted(quantiles)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            while pending and seen >= pending[0] * self.count:
+                results[pending.pop(0)] = min(self.bucket_upper(index), self.max)
+        for q in pending:
+            results[q] = self.max
+        return results
+
+
+class EndpointStats:
+    METRICS = ('total', 'db', 'view', 'render')
+
+    def __init__(self):
+        # deque of (slot, {metric: Histogram}, {'queries': int, 'bytes': int})
+        self.slots = deque()
+
+    def slot(self, slot_id):
+        if not self.slots or self.slots[-1][0] != slot_id:
+            self.slots.append((slot_id, {metric: Histogram() for metric in self.METRICS}, {'queries': 0, 'bytes': 0}))
+        return self.slots[-1]
+
+    def expire(self, oldest_slot):
+        while self.slots and self.slots[0][0] < oldest_slot:
+            self.slots.popleft()
+
+
+class PerfRegistry:
+    """Rolling per-endpoint histograms shared by every thread in the process"""
+    quantiles = (0.5, 0.9, 0.95, 0.99)
+
+    def __init__(self, window_seconds=900, slot_seconds=60):
+        self.window_seconds = window_seconds
+        self.slot_seconds = slot_seconds
+        self.endpoints = defaultdict(EndpointStats)
+        self.lock = threading.Lock()
+
+    def _slot_id(self, now):
+        return int(now // self.slot_seconds)
+
+    def record(self, endpoint, timings, now=None):
+        """timings: dict of metric -> milliseconds, plus 'queries' and 'bytes'"""
+        slot_id = self._slot_id(time.time() if now is None else now)
+        with self.lock:
+            _, histograms, totals = self.endpoints[endpoint].slot(slot_id)
+            for metric, histogram in histograms.items():
+                histogram.record(timings.get(f'{metric}_ms', 0) * 1000)
+            totals['queries'] += timings.get('queries', 0)
+            totals['bytes'] += timings.get('bytes', 0)
+
+    def snapshot(self, now=None):
+        now = time.time() if now is None else now
+        oldest = self._slot_id(now - self.window_seconds) + 1
+        results = []
+        with self.lock:
+            for endpoint, stats in self.endpoints.items():
+                stats.expire(oldest)
+                merged = {metric: Histogram() for metric in EndpointStats.METRICS}
+                queries = size = 0
+                for _, histograms, totals in stats.slots:
+                    for metric, histogram in histograms.items():
+                        merged[metric].merge(histogram)
+                    queries += totals['queries']
+                    size += totals['bytes']
+                count = merged['total'].count
+                if not count:
+                    continue
+                results.append({
+                    'endpoint': endpoint,
+                    'count': count,
+                    'avg_queries': round(queries / count, 2),
+                    'avg_bytes': round(size / count),
+                    **{metric: self._summary(histogram) for metric, histogram in merged.items()},
+                })
+        return sorted(results, key=lambda row: -row['total']['p95'])
+
+    def _summary(self, histogram):
+        percentiles = histogram.percentiles(self.quantiles)
+        summary = {f'p{int(q * 100)}': round(value / 1000, 3) for q, value in percentiles.items()}
+        summary['mean'] = round(histogram.total / histogram.count / 1000, 3) if histogram.count else 0
+        summary['max'] = round(histogram.max / 1000, 3)
+        return summary
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+
+def get_perf_config():
+    # LOG writes one JSON line per request to the app.perf logger; opt in where something collects it
+    config = {'ENABLED': True, 'SERVER_TIMING': True, 'LOG': False, 'WINDOW_SECONDS': 900}
+    config.update(getattr(settings, 'PERF_MONITORING', {}))
+    return config
+
+
+registry = PerfRegistry(window_seconds=get_perf_config()['WINDOW_SECONDS'])
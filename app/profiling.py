@@ -0,0 +1,146 @@
+"""
+Opt-in profiling of slow requests.
+
+Profiling is armed for a request when its endpoint (URL name) has been enabled
+by an admin, or when it carries the `X-Profile` header with the configured
+token. Armed requests run under cProfile (pstats output) or a sampling
+profiler (collapsed stacks, the input format of flamegraph.pl/speedscope).
+Only requests slower than the threshold are kept, in a bounded in-memory ring.
+"""
+import cProfile
+import itertools
+import marshal
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+
+
+DEFAULT_CONFIG = {
+    # URL names to profile, e.g. ['property-list']
+    'ENDPOINTS': [],
+    'THRESHOLD_MS': 500,
+    # 'cprofile' or 'sample'
+    'MODE': 'cprofile',
+    'SAMPLE_INTERVAL_MS': 5,
+    'MAX_PROFILES': 20,
+    # Requests sending `X-Profile: <token>` are profiled; None disables the header
+    'HEADER_TOKEN': None,
+}
+
+
+class SamplingProfiler:
+    """Samples one thread's stack from a background thread into collapsed stacks"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-sampler', daemon=True)
+
+    def enable(self):
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_filename}:{code.co_name}:{code.co_firstlineno}')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+
+class ProfileStore:
+    """Bounded ring of captured profiles plus the runtime profiling switches"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cprofile_lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.config = {**DEFAULT_CONFIG, **getattr(settings, 'PROFILING', {})}
+        self.profiles = deque(maxlen=self.config['MAX_PROFILES'])
+
+    def configure(self, **changes):
+        with self.lock:
+            self.config.update(changes)
+            if self.profiles.maxlen != self.config['MAX_PROFILES']:
+                self.profiles = deque(self.profiles, maxlen=self.config['MAX_PROFILES'])
+            return dict(self.config)
+
+    def should_profile(self, request, view_name):
+        token = self.config['HEADER_TOKEN']
+        if token and request.headers.get('X-Profile') == token:
+            return True
+        return view_name in self.config['ENDPOINTS']
+
+    def start(self):
+        """Return (profiler, start time), or None when no profiler can be started"""
+        if self.config['MODE'] == 'sample':
+            profiler = SamplingProfiler(self.config['SAMPLE_INTERVAL_MS'] / 1000)
+        else:
+            # Only one cProfile profiler may be active per process; skip
+            # rather than queue concurrent requests behind it.
+            if not self.cprofile_lock.acquire(blocking=False):
+                return None
+            profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler, time.perf_counter()
+
+    def finish(self, request, view_name, profiler, started):
+        profiler.disable()
+        if isinstance(profiler, cProfile.Profile):
+            self.cprofile_lock.release()
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms < self.config['THRESHOLD_MS']:
+            return None
+
+        if isinstance(profiler, SamplingProfiler):
+            kind, data = 'collapsed', profiler.stacks
+        else:
+            profiler.create_stats()
+            kind, data = 'pstats', marshal.dumps(profiler.stats)
+
+        with self.lock:
+            entry = {
+                'id': next(self.ids),
+                'kind': kind,
+                'view_name': view_name,
+                'method': request.method,
+                'path': request.path,
+                'query_string': request.META.get('QUERY_STRING', ''),
+                'duration_ms': round(duration_ms, 3),
+                'captured_at': time.time(),
+                'data': data,
+            }
+            self.profiles.append(entry)
+        return entry
+
+    def list(self):
+        with self.lock:
+            return [{k: v for k, v in entry.items() if k != 'data'} for entry in reversed(self.profiles)]
+
+    def get(self, profile_id):
+        with self.lock:
+            return next((entry for entry in self.profiles if entry['id'] == profile_id), None)
+
+    def clear(self):
+        with self.lock:
+            self.profiles.clear()
+
+
+def collapsed_stacks(entry):
+    """Render a sampled profile as 'frame;frame;frame count' lines"""
+    return ''.join(f'{stack} {count}\n' for stack, count in entry['data'].most_common())
+
+
+store = ProfileStore()
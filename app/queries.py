@@ -0,0 +1,162 @@
+"""
+Per-request SQL recording used to enforce query budgets and spot N+1 patterns.
+
+Queries are grouped by "shape" (the SQL with literals and IN-lists collapsed),
+so the same statement issued once per serialized row shows up as one shape
+with a high count. Each query is attributed to the innermost serializer field
+being rendered when it ran, which points straight at the nested serializer or
+model property that needs a select_related/prefetch_related.
+"""
+import contextvars
+import functools
+import re
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.fields import Field
+
+
+IN_LIST_RE = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+NUMBER_RE = re.compile(r'\b\d+\b')
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_shape(sql):
+    sql = IN_LIST_RE.sub('(...)', sql)
+    sql = STRING_RE.sub('?', sql)
+    return NUMBER_RE.sub('?', sql)
+
+
+def serializer_field_label(frame):
+    """Return 'Serializer.field' for the innermost field being rendered, if any"""
+    while frame is not None:
+        field = frame.f_locals.get('self')
+        # type() rather than isinstance(): the latter evaluates lazy objects, which may query
+        if issubclass(type(field), Field) and field.field_name and field.parent is not None:
+            return f'{type(field.parent).__name__}.{field.field_name}'
+        frame = frame.f_back
+    return None
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'alias': context['connection'].alias,
+                'duration': time.perf_counter() - start,
+                'field': serializer_field_label(sys._getframe(1)),
+            })
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(query['duration'] for query in self.queries)
+
+    def shapes(self):
+        """Group queries by shape, most repeated first"""
+        groups = defaultdict(lambda: {'count': 0, 'duration': 0.0, 'fields': set()})
+        for query in self.queries:
+            group = groups[query_shape(query['sql'])]
+            group['count'] += 1
+            group['duration'] += query['duration']
+            if query['field']:
+                group['fields'].add(query['field'])
+        return sorted(
+            ({'shape': shape, **group, 'fields': sorted(group['fields'])} for shape, group in groups.items()),
+            key=lambda group: -group['count'],
+        )
+
+    def n_plus_one(self, threshold=3):
+        """Repeated SELECT shapes, the signature of a missing prefetch"""
+        return [
+            group for group in self.shapes()
+            if group['count'] >= threshold and group['shape'].lstrip().upper().startswith('SELECT')
+        ]
+
+    def report(self, threshold=3):
+        return {
+            'count': self.count,
+            'duration': self.duration,
+            'n_plus_one': self.n_plus_one(threshold),
+        }
+
+
+class QueryTimer:
+    """Cheap wrapper counting queries and their total duration, for production use"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+# (wrapper, alias or None) pairs active in the current context, outermost first
+_active_wrappers = contextvars.ContextVar('query_wrappers', default=())
+
+
+def dispatch_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection; runs the wrappers active in this context"""
+    alias = context['connection'].alias
+    for wrapper, using in reversed(_active_wrappers.get()):
+        if using is None or using == alias:
+            execute = functools.partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_dispatch(sender, connection, **kwargs):
+    if dispatch_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(dispatch_query)
+
+
+@contextmanager
+def wrap_connections(wrapper, using=None):
+    """
+    Run `wrapper` around every query made in the current context on the given
+    (default: all) connections. The context follows sync_to_async calls into
+    their worker thread, so queries made through the async ORM are seen too.
+    """
+    token = _active_wrappers.set((*_active_wrappers.get(), (wrapper, using)))
+    try:
+        yield wrapper
+    finally:
+        _active_wrappers.reset(token)
+
+
+def record_queries(using=None):
+    """Record every query on the given (default: all) connections"""
+    return wrap_connections(QueryRecorder(), using)
+
+
+def describe(report):
+    """Human readable summary of an N+1 report"""
+    lines = []
+    for group in report['n_plus_one']:
+        source = ', '.join(group['fields']) or 'unknown field'
+        lines.append(f"  {group['count']}x from {source}: {group['shape'][:200]}")
+    return '\n'.join(lines)
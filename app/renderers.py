@@ -0,0 +1,72 @@
+"""
+orjson-backed JSON renderer and parser.
+
+Drop-in replacements for DRF's JSONRenderer and JSONParser that encode and
+decode with orjson (`pip install orjson`), which is several times faster
+than the stdlib json module on large listings. Output is byte-for-byte what
+JSONRenderer produces for API payloads: same compact separators, UTF-8
+without escaping, U+2028/U+2029 escaped, and datetimes, Decimals, UUIDs and
+lazy strings converted by DRF's own JSONEncoder.
+
+Floats are the exception: orjson writes those below 1e-4 or from 1e16 up
+without Python's exponent (`0.00001` for `1e-05`), the same number either
+way, and NaN/Infinity as null where JSONRenderer fails. Serializers here only
+emit floats in the ordinary range. Without orjson installed, or for what
+orjson cannot encode (indented output, integers over 64 bits), both classes
+fall back to DRF's implementation.
+"""
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    # Datetimes go through JSONEncoder too: orjson's own formatting differs in edge cases
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+# orjson reads integers past 64 bits (20+ digits) as floats; JSONParser keeps them
+# exact. Mapping every digit to 0 turns the check into a substring search.
+ZERO_DIGITS = bytes.maketrans(b'123456789', b'000000000')
+LONG_INTEGER = b'0' * 20
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (orjson is None or self.get_indent(accepted_media_type, renderer_context or {})
+                or not self.compact or self.ensure_ascii or self.encoder_class is not JSONEncoder):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer: valid JSON, but not valid JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8' or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_INTEGER in body.translate(ZERO_DIGITS):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # JSONParser words the error the way clients already see it
+            return super().parse(io.BytesIO(body), media_type, parser_context)
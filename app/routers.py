@@ -0,0 +1,124 @@
+"""
+Primary/replica database routing.
+
+Writes always go to the primary ('default'). Reads go to a replica only while
+ReplicaRoutingMiddleware has marked the current request as replica-safe: a
+GET/HEAD/OPTIONS request to a view that declares `use_read_replica = True`,
+from a client that has not written anything in the last STICKY_SECONDS.
+Clients are identified by their Authorization header, session cookie or IP,
+so a customer who just saved a property reads their own write back from the
+primary instead of a lagging replica.
+
+Replica aliases are listed in settings.READ_REPLICAS['DATABASES']; with none
+configured the router leaves every query on the primary. Stickiness lives in
+the STICKY_CACHE cache alias, which every worker process must share: with a
+per-process cache a client's next read can land on a process that never saw
+its write. check_sticky_cache refuses replicas on LocMemCache or DummyCache.
+"""
+import contextvars
+import hashlib
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+DEFAULT_CONFIG = {
+    'DATABASES': [],
+    'STICKY_SECONDS': 10,
+    # Must be shared by all workers (Redis, Memcached, the database cache...)
+    'STICKY_CACHE': 'default',
+    # Auth lookups must see tokens and sessions created moments ago
+    'PRIMARY_MODELS': ['authtoken.token', 'sessions.session'],
+}
+
+
+def get_replica_config():
+    return {**DEFAULT_CONFIG, **getattr(settings, 'READ_REPLICAS', {})}
+
+
+class RoutingState:
+    def __init__(self, read_replica=False):
+        self.read_replica = read_replica
+        # Chosen once per request so all its reads see the same snapshot
+        self.replica = None
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('db_routing', default=None)
+
+
+@contextmanager
+def routing(read_replica=False):
+    """Route the queries issued inside the block; yields the RoutingState"""
+    state = RoutingState(read_replica)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def client_key(request):
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    session = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if authorization:
+        identity = f'auth:{authorization}'
+    elif session:
+        identity = f'session:{session}'
+    else:
+        identity = f"ip:{request.META.get('REMOTE_ADDR', '')}"
+    return 'db-sticky:' + hashlib.sha256(identity.encode()).hexdigest()
+
+
+def mark_sticky(request):
+    config = get_replica_config()
+    caches[config['STICKY_CACHE']].set(client_key(request), True, config['STICKY_SECONDS'])
+
+
+def is_sticky(request):
+    return caches[get_replica_config()['STICKY_CACHE']].get(client_key(request)) is not None
+
+
+def check_sticky_cache(app_configs=None, **kwargs):
+    config = get_replica_config()
+    if not config['DATABASES']:
+        return []
+    if isinstance(caches[config['STICKY_CACHE']], (LocMemCache, DummyCache)):
+        return [checks.Error(
+            f"READ_REPLICAS needs a cache shared by all workers, but '{config['STICKY_CACHE']}' is per process.",
+            hint="Point READ_REPLICAS['STICKY_CACHE'] at a shared cache (Redis, Memcached, the database cache), "
+                 'or configure no replicas.',
+            id='app.E001',
+        )]
+    return []
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.read_replica:
+            return None
+        config = get_replica_config()
+        if not config['DATABASES'] or model._meta.label_lower in config['PRIMARY_MODELS']:
+            return None
+        if state.replica is None:
+            state.replica = random.choice(config['DATABASES'])
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        aliases = {'default', *get_replica_config()['DATABASES']}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
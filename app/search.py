@@ -0,0 +1,45 @@
+"""
+Property full-text search.
+
+On PostgreSQL the query runs against a tsvector over the listing text, backed
+by the GIN expression index created in migration 0009. Other backends fall
+back to case-insensitive substring matching on the same fields. The
+PostgreSQL path is experimental: the suite only exercises it when PostgreSQL
+is available.
+"""
+from django.db import connection
+from django.db.models import Q
+
+
+SEARCH_FIELDS = ('title', 'location', 'address', 'description')
+
+# 'simple' does no stemming, so Nepali place names and romanized words match as typed
+SEARCH_CONFIG = 'simple'
+
+
+def property_search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    # Must stay identical to the indexed expression, or PostgreSQL will not use the index
+    return SearchVector(*SEARCH_FIELDS, config=SEARCH_CONFIG)
+
+
+def search_properties(queryset, text):
+    """Filter `queryset` to properties matching `text`, best matches first on PostgreSQL"""
+    text = text.strip()
+    if not text:
+        return queryset
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        vector = property_search_vector()
+        return (
+            queryset.annotate(search=vector, search_rank=SearchRank(vector, query))
+            .filter(search=query)
+            .order_by('-search_rank', '-created_at')
+        )
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f'{field}__icontains': text})
+    return queryset.filter(condition).order_by('-created_at')
@@ -2,13 +2,18 @@ from rest_framework import serializers
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, OuterRef, Prefetch, Q, Subquery
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Coalesce, Greatest
 from .models import (
     User, Organization, PropertyType, Property, PropertyImage, Agent,
     PropertyInquiry, PropertyVisit, SavedProperty, Service, HeroSlide,
     JourneyStep, AboutUs, PropertyAlert, Gallery, GalleryImage,
-    NewsCategory, News, Team, Contact, CustomerMessage, CustomerDocument
+    NewsCategory, News, Team, Contact, Conversation, CustomerMessage, CustomerDocument
 )
 
+from .lookups import property_types
+
 User = get_user_model()
 
 
@@ -28,11 +33,8 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data.pop('password_confirm')
-        password = validated_data.pop('password')
-        user = User.objects.create_user(**validated_data)
-        user.set_password(password)
-        user.save()
-        return user
+        # create_user() hashes the password, so it is hashed exactly once
+        return User.objects.create_user(**validated_data)
 
 
 class UserLoginSerializer(serializers.Serializer):
@@ -133,14 +135,44 @@ class PropertyCreateUpdateSerializer(serializers.ModelSerializer):
 
 
 # Agent Serializers
+def agent_specializations_prefetch(lookup='specializations'):
+    """
+    Prefetch only specialization ids; the serialized rows come from the
+    in-process PropertyType table, so agents cost no per-row queries.
+    """
+    return Prefetch(lookup, queryset=PropertyType.objects.only('id'))
+
+
+class PropertyTypeLookupField(serializers.Field):
+    """Read-only many-to-many PropertyType field resolved through app.lookups"""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return [property_type.id for property_type in getattr(instance, self.source).all()]
+
+    def to_representation(self, ids):
+        return property_types.get_many(ids)
+
+
 class AgentSerializer(serializers.ModelSerializer):
-    specializations = PropertyTypeSerializer(many=True, read_only=True)
+    specializations = PropertyTypeLookupField()
     full_name = serializers.ReadOnlyField()
-    specialization_names = serializers.ReadOnlyField()
+    specialization_names = serializers.SerializerMethodField()
 
     class Meta:
         model = Agent
         fields = '__all__'
+        field_sources = {
+            'full_name': ('first_name', 'last_name'),
+            'specialization_names': ('specializations',),
+        }
+
+    def get_specialization_names(self, obj):
+        ids = [property_type.id for property_type in obj.specializations.all()]
+        return ", ".join(row['name'] for row in property_types.get_many(ids))
 
 
 # Customer Interaction Serializers
@@ -265,6 +297,15 @@ class AdminAnalyticsSerializer(serializers.Serializer):
     recent_inquiries = PropertyInquirySerializer(many=True)
 
 
+# Profiling Serializers
+class ProfilingConfigSerializer(serializers.Serializer):
+    endpoints = serializers.ListField(child=serializers.CharField(), required=False, source='ENDPOINTS')
+    threshold_ms = serializers.FloatField(min_value=0, required=False, source='THRESHOLD_MS')
+    mode = serializers.ChoiceField(choices=['cprofile', 'sample'], required=False, source='MODE')
+    sample_interval_ms = serializers.FloatField(min_value=1, required=False, source='SAMPLE_INTERVAL_MS')
+    max_profiles = serializers.IntegerField(min_value=1, max_value=500, required=False, source='MAX_PROFILES')
+
+
 # User Management Serializers (for admin)
 class UserManagementSerializer(serializers.ModelSerializer):
     class Meta:
@@ -289,10 +330,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
         else:
             validated_data['role'] = 'customer'
 
-        user = User.objects.create_user(**validated_data)
-        user.set_password(password)
-        user.save()
-        return user
+        return User.objects.create_user(password=password, **validated_data)
 
 
 class UserUpdateSerializer(serializers.ModelSerializer):
@@ -328,6 +366,50 @@ class GallerySerializer(serializers.ModelSerializer):
         read_only_fields = ('created_at', 'updated_at')
 
 
+def active_gallery_images_prefetch(lookup='images'):
+    """Prefetch only the images public gallery endpoints show"""
+    return Prefetch(lookup, queryset=GalleryImage.objects.filter(is_active=True))
+
+
+def with_gallery_summary(queryset):
+    """
+    Annotate galleries with their cover image name, active image count and
+    last change (the gallery's own or its newest active image), in the same query
+    """
+    active = Q(images__is_active=True)
+    cover = GalleryImage.objects.filter(gallery=OuterRef('pk'), is_active=True).order_by('order', 'created_at')
+    return queryset.annotate(
+        cover_image=Subquery(cover.values('image')[:1]),
+        image_count=Count('images', filter=active),
+        last_updated=Greatest('updated_at', Coalesce(Max('images__created_at', filter=active), 'updated_at')),
+    )
+
+
+class AnnotatedImageField(serializers.ImageField):
+    """Read-only ImageField for a file name annotated onto the row instead of loaded as a FieldFile"""
+
+    def __init__(self, model_field, **kwargs):
+        self.model_field = model_field
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if value and not isinstance(value, FieldFile):
+            value = FieldFile(None, self.model_field, value)
+        return super().to_representation(value)
+
+
+class GallerySummarySerializer(serializers.ModelSerializer):
+    """A gallery without its images; rows come from with_gallery_summary"""
+    cover_image = AnnotatedImageField(GalleryImage._meta.get_field('image'))
+    image_count = serializers.IntegerField(read_only=True)
+    last_updated = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = Gallery
+        fields = ('id', 'title', 'description', 'order', 'created_at', 'updated_at', 'cover_image', 'image_count', 'last_updated')
+
+
 # News Serializers
 class NewsCategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -341,10 +423,23 @@ class NewsSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = News
-        fields = '__all__'
+        exclude = ('listing_excerpt',)
         read_only_fields = ('created_at', 'updated_at')
 
 
+class NewsListSerializer(serializers.ModelSerializer):
+    """News for list pages: no content, and the excerpt stored by News.save()"""
+    category_details = NewsCategorySerializer(source='category', read_only=True)
+    excerpt = serializers.CharField(source='listing_excerpt', read_only=True)
+
+    class Meta:
+        model = News
+        fields = (
+            'id', 'category_details', 'title', 'slug', 'excerpt', 'featured_image', 'meta_title', 'meta_description',
+            'is_featured', 'is_published', 'published_at', 'created_at', 'updated_at', 'category',
+        )
+
+
 # Team Serializers
 class TeamSerializer(serializers.ModelSerializer):
     class Meta:
@@ -420,6 +515,22 @@ class CustomerMessageSerializer(serializers.ModelSerializer):
             return obj.created_at.strftime('%b %d, %Y')
 
 
+class ConversationLastMessageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CustomerMessage
+        fields = ('id', 'subject', 'message', 'is_from_customer', 'is_read', 'created_at')
+
+
+class ConversationSerializer(serializers.ModelSerializer):
+    agent_details = AgentSerializer(source='agent', read_only=True)
+    property_details = PropertySerializer(source='property', read_only=True)
+    last_message = ConversationLastMessageSerializer(read_only=True)
+
+    class Meta:
+        model = Conversation
+        exclude = ('agent_unread_count',)
+
+
 class CustomerMessageCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomerMessage
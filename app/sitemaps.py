@@ -0,0 +1,211 @@
+"""
+Pre-generated sitemaps and feeds for Property and News.
+
+`manage.py build_sitemaps` (run it from cron) writes into SITEMAPS['ROOT']:
+
+    sitemap.xml                      sitemap index
+    sitemaps/properties-<n>.xml      active properties with n * MAX_URLS <= id < (n + 1) * MAX_URLS
+    sitemaps/news-<n>.xml            published articles, likewise
+    feeds/properties.rss, .atom      newest FEED_ITEMS listings
+    feeds/news.rss, .atom            newest FEED_ITEMS articles
+
+Splitting by id range keeps every sitemap within the protocol's 50,000 URL
+limit and every row in the same file for good, so a build only rewrites the
+files whose row count or newest `updated_at` changed since the last one
+(recorded in manifest.json). Files are replaced atomically and get their
+newest `updated_at` as mtime, which serve_generated - or the web server,
+pointed at ROOT - sends as Last-Modified.
+"""
+import json
+import os
+import string
+from datetime import timezone as dt_timezone
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, F, Max
+from django.utils import feedgenerator
+from django.utils.text import Truncator
+from django.views.decorators.http import require_safe
+from django.views.static import serve
+
+from .models import News, Property
+
+
+DEFAULT_CONFIG = {
+    'SITE_URL': 'https://simthalirealestate.com',
+    'SITE_NAME': 'Simthali Real Estate',
+    'ROOT': os.path.join(settings.BASE_DIR, 'sitemaps'),
+    # Public page paths, formatted with fields of the row (id, slug, ...)
+    'PROPERTY_PATH': '/properties/{id}',
+    'NEWS_PATH': '/news/{slug}',
+    'MAX_URLS': 50000,
+    'FEED_ITEMS': 50,
+}
+
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+CONTENT_TYPES = {
+    '.xml': 'application/xml',
+    '.rss': 'application/rss+xml; charset=utf-8',
+    '.atom': 'application/atom+xml; charset=utf-8',
+}
+
+
+def get_sitemaps_config():
+    return {**DEFAULT_CONFIG, **getattr(settings, 'SITEMAPS', {})}
+
+
+def sections(config):
+    """(name, queryset, page path template) for each kind of page"""
+    return [
+        ('properties', Property.objects.filter(is_active=True), config['PROPERTY_PATH']),
+        ('news', News.objects.filter(is_published=True), config['NEWS_PATH']),
+    ]
+
+
+def page_url(config, template, row):
+    return config['SITE_URL'].rstrip('/') + template.format(**row)
+
+
+def template_fields(template):
+    return [name for _, name, _, _ in string.Formatter().parse(template) if name]
+
+
+def w3c_datetime(value):
+    return value.astimezone(dt_timezone.utc).isoformat(timespec='seconds')
+
+
+def write_file(path, write, modified=None):
+    """Write `path` through `write(file)` atomically, with `modified` (a datetime) as mtime"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        write(file)
+    if modified is not None:
+        os.utime(temporary, (modified.timestamp(), modified.timestamp()))
+    os.replace(temporary, path)
+
+
+def write_urlset(file, urls):
+    file.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{XMLNS}">\n')
+    for url, lastmod in urls:
+        file.write(f'<url><loc>{escape(url)}</loc><lastmod>{w3c_datetime(lastmod)}</lastmod></url>\n')
+    file.write('</urlset>\n')
+
+
+def write_index(file, config, sitemaps):
+    base = config['SITE_URL'].rstrip('/')
+    file.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{XMLNS}">\n')
+    for name, lastmod in sitemaps:
+        file.write(f'<sitemap><loc>{escape(base)}/{name}</loc><lastmod>{w3c_datetime(lastmod)}</lastmod></sitemap>\n')
+    file.write('</sitemapindex>\n')
+
+
+def feed_items(name, queryset, template, config):
+    """(title, page path fields, description, published, updated) of the newest rows of a section"""
+    fields = template_fields(template)
+    if name == 'news':
+        columns, newest_first = ('title', 'listing_excerpt', 'published_at'), '-published_at'
+    else:
+        columns, newest_first = ('title', 'description', 'location', 'created_at'), '-created_at'
+    for row in queryset.order_by(newest_first).only(*columns, *fields, 'updated_at')[:config['FEED_ITEMS']]:
+        path_fields = {field: getattr(row, field) for field in fields}
+        if name == 'news':
+            yield row.title, path_fields, row.listing_excerpt, row.published_at, row.updated_at
+        else:
+            description = f'{row.location}. {Truncator(row.description).chars(300)}'
+            yield row.title, path_fields, description, row.created_at, row.updated_at
+
+
+def write_feeds(name, queryset, template, config, manifest, force):
+    """Write the RSS and Atom feeds of a section if their items changed. Returns files written."""
+    items = list(feed_items(name, queryset, template, config))
+    signature = [
+        config['SITE_URL'], template, [[str(path_fields), updated.isoformat()] for _, path_fields, _, _, updated in items],
+    ]
+    written = []
+    for extension, feed_class in (('rss', feedgenerator.Rss201rev2Feed), ('atom', feedgenerator.Atom1Feed)):
+        path = f'feeds/{name}.{extension}'
+        if not force and manifest.get(path) == signature and os.path.exists(os.path.join(config['ROOT'], path)):
+            continue
+        feed = feed_class(
+            title=f'{config["SITE_NAME"]} - {name.capitalize()}',
+            link=config['SITE_URL'], description=f'Latest {name} from {config["SITE_NAME"]}',
+            feed_url=f'{config["SITE_URL"].rstrip("/")}/{path}', language=settings.LANGUAGE_CODE,
+        )
+        for title, path_fields, description, published, updated in items:
+            url = page_url(config, template, path_fields)
+            feed.add_item(
+                title=title, link=url, description=description, pubdate=published, updateddate=updated, unique_id=url,
+            )
+        newest = max((updated for *_, updated in items), default=None)
+        write_file(os.path.join(config['ROOT'], path), lambda file: feed.write(file, 'utf-8'), newest)
+        manifest[path] = signature
+        written.append(path)
+    return written
+
+
+def build(force=False, config=None):
+    """
+    Bring the sitemaps and feeds under ROOT up to date.
+    Returns {'written': [paths], 'removed': [paths]} relative to ROOT.
+    """
+    config = config or get_sitemaps_config()
+    root, size = config['ROOT'], config['MAX_URLS']
+    manifest_path = os.path.join(root, 'manifest.json')
+    try:
+        with open(manifest_path, encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+
+    written, current, index = [], set(), []
+    for name, queryset, template in sections(config):
+        chunks = queryset.order_by().annotate(chunk=F('id') / size).values('chunk').annotate(
+            count=Count('id'), last=Max('updated_at'),
+        ).order_by('chunk')
+        fields = ['id', 'updated_at', *[field for field in template_fields(template) if field not in ('id', 'updated_at')]]
+        for chunk in chunks:
+            path = f'sitemaps/{name}-{chunk["chunk"]}.xml'
+            current.add(path)
+            index.append((path, chunk['last']))
+            signature = [config['SITE_URL'], template, chunk['count'], chunk['last'].isoformat()]
+            if not force and manifest.get(path) == signature and os.path.exists(os.path.join(root, path)):
+                continue
+            rows = queryset.filter(
+                id__gte=chunk['chunk'] * size, id__lt=(chunk['chunk'] + 1) * size,
+            ).order_by('id').values(*fields)
+            urls = ((page_url(config, template, row), row['updated_at']) for row in rows.iterator(chunk_size=2000))
+            write_file(os.path.join(root, path), lambda file: write_urlset(file, urls), chunk['last'])
+            manifest[path] = signature
+            written.append(path)
+
+        written += write_feeds(name, queryset, template, config, manifest, force)
+        current.update(f'feeds/{name}.{extension}' for extension in ('rss', 'atom'))
+
+    removed = []
+    for path in sorted(set(manifest) - current - {'sitemap.xml'}):
+        try:
+            os.remove(os.path.join(root, path))
+        except FileNotFoundError:
+            pass
+        del manifest[path]
+        removed.append(path)
+
+    signature = [config['SITE_URL'], [[path, lastmod.isoformat()] for path, lastmod in index]]
+    if force or manifest.get('sitemap.xml') != signature or not os.path.exists(os.path.join(root, 'sitemap.xml')):
+        newest = max((lastmod for _, lastmod in index), default=None)
+        write_file(os.path.join(root, 'sitemap.xml'), lambda file: write_index(file, config, index), newest)
+        manifest['sitemap.xml'] = signature
+        written.append('sitemap.xml')
+
+    write_file(manifest_path, lambda file: json.dump(manifest, file, indent=1))
+    return {'written': written, 'removed': removed}
+
+
+@require_safe
+def serve_generated(request, path):
+    """A file build() wrote, with Last-Modified and If-Modified-Since handled by django.views.static"""
+    response = serve(request, path, document_root=get_sitemaps_config()['ROOT'])
+    response['Content-Type'] = CONTENT_TYPES[os.path.splitext(path)[1]]
+    return response
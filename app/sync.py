@@ -0,0 +1,197 @@
+"""
+Delta sync for the customer dashboard.
+
+GET /api/customer/sync/ takes a watermark per collection, e.g.
+`?messages=2026-10-01T09:30:00.123456Z&alerts=`, and returns for each one the
+rows changed since that watermark, the ids deleted since then and a new
+watermark to send next time. An empty or missing watermark, or one older than
+the tombstone retention, gets a full listing with `full: true`, after which
+the client replaces its copy of that collection.
+
+Changes are found through `updated_at`; deletions through SyncTombstone rows
+written by the post_delete receiver below. Rows that leave a dashboard list
+without being deleted (deactivated alerts and documents) are reported as
+deleted too. Watermarks are inclusive and lag the clock by OVERLAP_SECONDS,
+so a row committed by a slow concurrent transaction is never skipped; clients
+upsert by id and ignore repeats. A page cut short by MAX_ROWS (`more: true`)
+instead returns the cursor `<updated_at>,<id>` of its last row, and the next
+call resumes strictly after it, so rows sharing a timestamp are not resent.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import DateTimeField
+
+from .models import (
+    Conversation, CustomerDocument, CustomerMessage, PropertyAlert, PropertyInquiry, PropertyVisit, SavedProperty,
+    SyncTombstone, User,
+)
+from .serializers import (
+    ConversationSerializer, CustomerDocumentSerializer, CustomerMessageSerializer, PropertyAlertSerializer, PropertyInquirySerializer,
+    PropertyVisitSerializer, SavedPropertySerializer, agent_specializations_prefetch,
+)
+
+
+DEFAULT_CONFIG = {
+    'MAX_ROWS': 200,
+    'OVERLAP_SECONDS': 5,
+    'TOMBSTONE_DAYS': 30,
+}
+
+
+def get_sync_config():
+    return {**DEFAULT_CONFIG, **getattr(settings, 'SYNC', {})}
+
+
+class Collection:
+    def __init__(self, name, model, serializer_class, select_related=(), prefetch_related=(), active_field=None):
+        self.name = name
+        self.model = model
+        self.serializer_class = serializer_class
+        self.select_related = select_related
+        self.prefetch_related = prefetch_related
+        # Rows with this field False are hidden from the dashboard, so sync reports them as deleted
+        self.active_field = active_field
+
+    def queryset(self, customer):
+        return self.model.objects.filter(customer=customer).select_related(
+            *self.select_related
+        ).prefetch_related(*self.prefetch_related).order_by('updated_at', 'id')
+
+    def is_active(self, row):
+        return self.active_field is None or getattr(row, self.active_field)
+
+
+# Same related loading as the dashboard list views in app.views
+COLLECTIONS = {collection.name: collection for collection in (
+    Collection(
+        'saved_properties', SavedProperty, SavedPropertySerializer,
+        select_related=('property__property_type',), prefetch_related=('property__images',),
+    ),
+    Collection(
+        'inquiries', PropertyInquiry, PropertyInquirySerializer,
+        select_related=('customer', 'property__property_type', 'agent'),
+        prefetch_related=('property__images', agent_specializations_prefetch('agent__specializations')),
+    ),
+    Collection(
+        'visits', PropertyVisit, PropertyVisitSerializer,
+        select_related=('customer', 'property__property_type', 'agent'),
+        prefetch_related=('property__images', agent_specializations_prefetch('agent__specializations')),
+    ),
+    Collection(
+        'messages', CustomerMessage, CustomerMessageSerializer,
+        select_related=('agent', 'property__property_type'),
+        prefetch_related=('property__images', agent_specializations_prefetch('agent__specializations')),
+    ),
+    Collection(
+        'conversations', Conversation, ConversationSerializer,
+        select_related=('agent', 'property__property_type', 'last_message'),
+        prefetch_related=('property__images', agent_specializations_prefetch('agent__specializations')),
+    ),
+    Collection(
+        'documents', CustomerDocument, CustomerDocumentSerializer,
+        select_related=('property__property_type',), prefetch_related=('property__images',),
+        active_field='is_active',
+    ),
+    Collection(
+        'alerts', PropertyAlert, PropertyAlertSerializer,
+        select_related=('customer', 'property_type'), active_field='is_active',
+    ),
+)}
+
+COLLECTION_NAMES = {collection.model: collection.name for collection in COLLECTIONS.values()}
+
+datetime_field = DateTimeField()
+
+
+def parse_watermark(name, value):
+    """(datetime, id of the last row sent or None), or None for no watermark"""
+    if not value:
+        return None
+    timestamp, _, last_id = value.partition(',')
+    watermark = parse_datetime(timestamp)
+    if watermark is None or (last_id and not last_id.isdigit()):
+        raise ValidationError({name: 'Invalid watermark.'})
+    if timezone.is_naive(watermark):
+        watermark = timezone.make_aware(watermark)
+    return watermark, int(last_id) if last_id else None
+
+
+def sync_collection(collection, request, watermark, now):
+    config = get_sync_config()
+    since, last_id = watermark or (None, None)
+    # A cursor continues a listing already under way, however old its rows are
+    full = since is None or (last_id is None and since < now - timedelta(days=config['TOMBSTONE_DAYS']))
+    queryset = collection.queryset(request.user)
+    if full:
+        if collection.active_field:
+            queryset = queryset.filter(**{collection.active_field: True})
+    elif last_id is not None:
+        queryset = queryset.filter(Q(updated_at__gt=since) | Q(updated_at=since, id__gt=last_id))
+    else:
+        queryset = queryset.filter(updated_at__gte=since)
+    rows = list(queryset[:config['MAX_ROWS'] + 1])
+    more = len(rows) > config['MAX_ROWS']
+    rows = rows[:config['MAX_ROWS']]
+
+    deleted = [row.id for row in rows if not collection.is_active(row)]
+    if not full:
+        deleted += SyncTombstone.objects.filter(
+            customer=request.user, collection=collection.name, deleted_at__gte=since,
+        ).values_list('object_id', flat=True)
+    changed = [row for row in rows if collection.is_active(row)]
+
+    if more:
+        # Resume after the last row sent; the client calls again straight away
+        watermark = f'{datetime_field.to_representation(rows[-1].updated_at)},{rows[-1].id}'
+    else:
+        watermark = now - timedelta(seconds=config['OVERLAP_SECONDS'])
+        if since is not None and not full:
+            watermark = max(watermark, since)
+        watermark = datetime_field.to_representation(watermark)
+    serializer = collection.serializer_class(changed, many=True, context={'request': request})
+    return {
+        'changed': serializer.data,
+        'deleted': sorted(set(deleted)),
+        'watermark': watermark,
+        'full': full,
+        'more': more,
+    }
+
+
+def sync(request):
+    """Build the sync response for the collections named in request.query_params (all by default)"""
+    params = request.query_params
+    names = [name for name in COLLECTIONS if name in params] or list(COLLECTIONS)
+    watermarks = {name: parse_watermark(name, params.get(name)) for name in names}
+    now = timezone.now()
+    return {name: sync_collection(COLLECTIONS[name], request, watermarks[name], now) for name in names}
+
+
+def prune_tombstones(now=None):
+    """Delete tombstones older than TOMBSTONE_DAYS; clients that far behind get a full sync"""
+    now = now or timezone.now()
+    horizon = now - timedelta(days=get_sync_config()['TOMBSTONE_DAYS'])
+    return SyncTombstone.objects.filter(deleted_at__lt=horizon).delete()[0]
+
+
+@receiver(post_delete, sender=SavedProperty)
+@receiver(post_delete, sender=PropertyInquiry)
+@receiver(post_delete, sender=PropertyVisit)
+@receiver(post_delete, sender=CustomerMessage)
+@receiver(post_delete, sender=Conversation)
+@receiver(post_delete, sender=CustomerDocument)
+@receiver(post_delete, sender=PropertyAlert)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    # Deleting the customer takes their rows with them; there is nobody left to sync
+    if isinstance(origin, User) or getattr(origin, 'model', None) is User:
+        return
+    SyncTombstone.objects.create(
+        customer_id=instance.customer_id, collection=COLLECTION_NAMES[sender], object_id=instance.pk,
+    )
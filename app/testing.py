@@ -0,0 +1,86 @@
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from contextlib import contextmanager
+
+from django.test import override_settings
+
+from .queries import QueryBudgetExceeded, describe, record_queries
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin that runs QueryInspectorMiddleware in strict mode, so any
+    request exceeding its view's `query_budget` or repeating a query shape
+    (N+1) raises QueryBudgetExceeded through the test client.
+    """
+    n_plus_one_threshold = 3
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(override_settings(QUERY_INSPECTOR={
+            'ENABLED': True,
+            'STRICT': True,
+            'N_PLUS_ONE_THRESHOLD': self.n_plus_one_threshold,
+        }))
+
+    @contextmanager
+    def assertQueryBudget(self, budget):
+        """Fail if the block issues more than `budget` queries or an N+1 pattern"""
+        with record_queries() as recorder:
+            yield recorder
+        report = recorder.report(self.n_plus_one_threshold)
+        if report['count'] > budget:
+            raise QueryBudgetExceeded(f"{report['count']} queries exceed the budget of {budget}")
+        if report['n_plus_one']:
+            raise QueryBudgetExceeded('N+1 query pattern detected:\n' + describe(report))
+
+
+def postgres_binaries():
+    """Directory holding initdb/pg_ctl, from POSTGRES_BIN or PATH; None if PostgreSQL is not installed"""
+    directory = os.environ.get('POSTGRES_BIN')
+    if directory:
+        return directory if os.path.exists(os.path.join(directory, 'initdb')) else None
+    initdb = shutil.which('initdb')
+    return os.path.dirname(initdb) if initdb else None
+
+
+@contextmanager
+def temporary_postgres():
+    """
+    Yield a DATABASE_URL for a PostgreSQL instance to test against.
+
+    POSTGRES_TEST_URL points at an existing server (e.g. a container started by
+    CI). Otherwise a throwaway cluster is created with initdb in a temporary
+    directory, listening on a free local port, and removed afterwards.
+    """
+    url = os.environ.get('POSTGRES_TEST_URL')
+    if url:
+        yield url
+        return
+    bin_dir = postgres_binaries()
+    if not bin_dir:
+        raise FileNotFoundError('PostgreSQL binaries not found; set POSTGRES_BIN or POSTGRES_TEST_URL')
+
+    with tempfile.TemporaryDirectory() as directory:
+        data = os.path.join(directory, 'data')
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        subprocess.run(
+            [os.path.join(bin_dir, 'initdb'), '-D', data, '-U', 'postgres', '-A', 'trust'],
+            check=True, capture_output=True,
+        )
+        subprocess.run(
+            [os.path.join(bin_dir, 'pg_ctl'), '-D', data, '-l', os.path.join(directory, 'server.log'), '-w',
+             '-o', f'-p {port} -k {directory} -c listen_addresses=127.0.0.1', 'start'],
+            check=True, capture_output=True,
+        )
+        try:
+            yield f'postgres://postgres@127.0.0.1:{port}/postgres'
+        finally:
+            subprocess.run(
+                [os.path.join(bin_dir, 'pg_ctl'), '-D', data, '-m', 'fast', 'stop'], capture_output=True,
+            )
@@ -0,0 +1,195 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Parse a rate string such as '5/min' or '100/hour' into (requests, seconds)"""
+    if rate is None:
+        return None, None
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period.strip()[0].lower()]
+
+
+# Rate Stores
+class RateStore:
+    """
+    Token bucket storage. Each key holds (tokens, last_refill) and is refilled
+    continuously at `limit / duration` tokens per second up to `limit`.
+    """
+
+    def hit(self, key, limit, duration, now=None):
+        """Consume one token. Returns (allowed, seconds_until_next_token)"""
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+    @staticmethod
+    def _consume(state, limit, duration, now):
+        tokens, last = state if state else (float(limit), now)
+        refill_rate = limit / duration
+        tokens = min(float(limit), tokens + (now - last) * refill_rate)
+        if tokens >= 1:
+            return (tokens - 1, now), True, 0.0
+        return (tokens, now), False, (1 - tokens) / refill_rate
+
+
+class LocalMemoryRateStore(RateStore):
+    """Per-process store. Least recently used keys are evicted past `max_keys`."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, duration, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            state, allowed, wait = self._consume(self._buckets.pop(key, None), limit, duration, now)
+            self._buckets[key] = state
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, wait
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheRateStore(RateStore):
+    """
+    Store backed by a Django cache alias so limits are shared across workers
+    when the alias points at a shared backend (e.g. Redis or Memcached).
+    With the default LocMemCache it behaves as a local stand-in.
+
+    A bucket read and written back by two workers at once would let both
+    through, so this store only uses the backend's atomic add() and incr():
+    each key counts hits in fixed windows of `duration` and the previous
+    window's count is weighted by how much of it still overlaps the last
+    `duration` seconds. That approximates the token bucket's refill rate.
+    """
+
+    def __init__(self, alias='default', key_prefix='throttle'):
+        self.alias = alias
+        self.key_prefix = key_prefix
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _generation(self):
+        # Bumped by reset() so it never has to touch keys outside the prefix
+        return self.cache.get_or_set(f'{self.key_prefix}:generation', 0, None)
+
+    def _incr(self, cache_key, delta, timeout):
+        self.cache.add(cache_key, 0, timeout)
+        try:
+            return self.cache.incr(cache_key, delta)
+        except ValueError:
+            # Expired or evicted between add() and incr()
+            self.cache.set(cache_key, max(delta, 0), timeout)
+            return max(delta, 0)
+
+    def hit(self, key, limit, duration, now=None):
+        now = time.time() if now is None else now
+        window, elapsed = divmod(now, duration)
+        prefix = f'{self.key_prefix}:{self._generation()}:{key}'
+        count = self._incr(f'{prefix}:{int(window)}', 1, duration * 2)
+        previous = self.cache.get(f'{prefix}:{int(window) - 1}', 0)
+        overlap = 1 - elapsed / duration
+        if previous * overlap + count <= limit:
+            return True, 0.0
+        # Refused hits do not use up the limit
+        count = self._incr(f'{prefix}:{int(window)}', -1, duration * 2)
+        if count < limit:
+            # Until enough of the previous window has slid out
+            wait = (1 - (limit - count - 1) / previous) * duration - elapsed
+        else:
+            # This window is full too, so into the next one, where it is the previous
+            wait = duration - elapsed + (1 - (limit - 1) / count) * duration
+        return False, max(wait, 0.0)
+
+    def reset(self):
+        key = f'{self.key_prefix}:generation'
+        self.cache.add(key, 0, None)
+        self.cache.incr(key)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_rate_store():
+    """Return the process-wide store configured by settings.THROTTLE_STORE"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                path = getattr(settings, 'THROTTLE_STORE', 'app.throttling.LocalMemoryRateStore')
+                _store = import_string(path)()
+    return _store
+
+
+# Throttle Classes
+class ScopedBucketThrottle(BaseThrottle):
+    """
+    Base throttle keyed by the view's `throttle_scope`. Rates are read from
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] under '<scope>.<kind>', e.g.
+    'contact.ip': '5/min'. Views without a configured rate are not throttled.
+    """
+    kind = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def get_rate(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return None
+        return api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}.{self.kind}')
+
+    def allow_request(self, request, view):
+        limit, duration = parse_rate(self.get_rate(view))
+        if limit is None:
+            return True
+        ident = self.get_ident_key(request)
+        if ident is None:
+            return True
+
+        key = f'{view.throttle_scope}.{self.kind}:{ident}'
+        allowed, self.wait_seconds = get_rate_store().hit(key, limit, duration)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPRateThrottle(ScopedBucketThrottle):
+    """Limits every client (anonymous or not) by remote address"""
+    kind = 'ip'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class UserRateThrottle(ScopedBucketThrottle):
+    """Limits authenticated users by primary key; anonymous requests pass through"""
+    kind = 'user'
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
@@ -1,21 +1,24 @@
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 from .views import (
     # Authentication Views
     UserRegistrationView, UserLoginView, UserLogoutView, UserDetailView,
 
     # Property Views
-    PropertyViewSet,
+    PropertyViewSet, LocationAutocompleteView,
 
     # Customer Dashboard Views
     CustomerSavedPropertiesView, CustomerSavedPropertyCreateView, CustomerSavedPropertyDeleteView,
     CustomerInquiriesView, CustomerInquiryCreateView,
     CustomerVisitsView, CustomerVisitCreateView,
     CustomerMessagesView, CustomerMessageCreateView,
-    CustomerDocumentsView, CustomerDocumentDownloadView,
+    CustomerConversationsView, CustomerConversationMessagesView, CustomerConversationReadView,
+    CustomerDocumentsView, CustomerDocumentDownloadView, CustomerSyncView,
 
     # Admin Dashboard Views
-    AdminAnalyticsView, AdminUserManagementViewSet,
+    AdminAnalyticsView, AdminPerfView, AdminUserManagementViewSet,
+    AdminProfilingConfigView, AdminProfileListView, AdminProfileDownloadView,
     AdminServiceManagementViewSet, AdminHeroSlideManagementViewSet,
     AdminJourneyStepManagementViewSet, AdminAgentManagementViewSet,
     AdminPropertyTypeManagementViewSet, AdminOrganizationManagementView,
@@ -31,7 +34,8 @@ from .views import (
     PropertyAlertListCreateView, PropertyAlertDetailView,
 
     # Gallery and News Views
-    GalleryListView, GalleryDetailView, NewsCategoryListView, NewsListView, NewsDetailView,
+    GalleryListView, GallerySummaryListView, GalleryDetailView, GalleryImageListView,
+    NewsCategoryListView, NewsListView, NewsDetailView,
 
     # Team Views
     TeamListView,
@@ -39,6 +43,8 @@ from .views import (
     # Contact Views
     ContactCreateView
 )
+from . import async_views
+from .sitemaps import serve_generated
 
 # Router for ViewSets
 router = DefaultRouter()
@@ -76,8 +82,13 @@ urlpatterns = [
     path('api/customer/visits/create/', CustomerVisitCreateView.as_view(), name='customer-visits-create'),
     path('api/customer/messages/', CustomerMessagesView.as_view(), name='customer-messages'),
     path('api/customer/messages/create/', CustomerMessageCreateView.as_view(), name='customer-messages-create'),
+    path('api/customer/conversations/', CustomerConversationsView.as_view(), name='customer-conversations'),
+    path('api/customer/conversations/<int:pk>/messages/', CustomerConversationMessagesView.as_view(), name='customer-conversation-messages'),
+    path('api/customer/conversations/<int:pk>/read/', CustomerConversationReadView.as_view(), name='customer-conversation-read'),
     path('api/customer/documents/', CustomerDocumentsView.as_view(), name='customer-documents'),
     path('api/customer/documents/<int:pk>/download/', CustomerDocumentDownloadView.as_view(), name='customer-document-download'),
+    path('api/customer/events/', async_views.CustomerEventStreamView.as_view(), name='customer-events'),
+    path('api/customer/sync/', CustomerSyncView.as_view(), name='customer-sync'),
 
     # Property Alerts URLs
     path('api/customer/alerts/', PropertyAlertListCreateView.as_view(), name='property-alerts'),
@@ -85,12 +96,17 @@ urlpatterns = [
     
     # Admin Dashboard URLs
     path('api/admin/analytics/', AdminAnalyticsView.as_view(), name='admin-analytics'),
+    path('api/admin/perf/', AdminPerfView.as_view(), name='admin-perf'),
+    path('api/admin/profiling/', AdminProfilingConfigView.as_view(), name='admin-profiling'),
+    path('api/admin/profiles/', AdminProfileListView.as_view(), name='admin-profiles'),
+    path('api/admin/profiles/<int:profile_id>/download/', AdminProfileDownloadView.as_view(), name='admin-profile-download'),
     path('api/admin/organization/', AdminOrganizationManagementView.as_view(), name='admin-organization'),
     path('api/admin/contacts/', AdminContactsView.as_view(), name='admin-contacts'),
     path('api/admin/contacts/<int:contact_id>/mark_resolved/', AdminContactResolveView.as_view(), name='admin-contact-resolve'),
     path('api/admin/achievements/', AdminAchievementsView.as_view(), name='admin-achievements'),
     
     # Content Management URLs
+    path('api/locations/autocomplete/', LocationAutocompleteView.as_view(), name='location-autocomplete'),
     path('api/property-types/', PropertyTypeListView.as_view(), name='property-types'),
     path('api/organization/', OrganizationDetailView.as_view(), name='organization-detail'),
     path('api/services/', ServiceListView.as_view(), name='services'),
@@ -103,7 +119,9 @@ urlpatterns = [
 
     # Gallery URLs
     path('api/gallery/', GalleryListView.as_view(), name='gallery-list'),
+    path('api/gallery/summary/', GallerySummaryListView.as_view(), name='gallery-summary'),
     path('api/gallery/<int:pk>/', GalleryDetailView.as_view(), name='gallery-detail'),
+    path('api/gallery/<int:pk>/images/', GalleryImageListView.as_view(), name='gallery-images'),
 
     # News URLs
     path('api/news/categories/', NewsCategoryListView.as_view(), name='news-categories'),
@@ -113,6 +131,33 @@ urlpatterns = [
     # Contact URLs
     path('api/contact/', ContactCreateView.as_view(), name='contact-create'),
 
+    # Sitemaps and feeds written by build_sitemaps
+    re_path(r'^(?P<path>sitemap\.xml|sitemaps/[\w-]+\.xml|feeds/\w+\.(?:rss|atom))$', serve_generated, name='sitemaps'),
+
     # Include router URLs
     path('api/', include(router.urls)),
-]
\ No newline at end of file
+]
+# Async mirrors of the public read endpoints, served in place of the DRF views
+# when ASYNC_READ_VIEWS is enabled (ASGI deployments)
+async_urlpatterns = [
+    path('api/properties/', async_views.PropertyListAsyncView.as_view(), name='property-list'),
+    path('api/properties/<int:pk>/', async_views.PropertyDetailAsyncView.as_view(), name='property-detail'),
+    path('api/property-types/', async_views.PropertyTypeListAsyncView.as_view(), name='property-types'),
+    path('api/organization/', async_views.OrganizationDetailAsyncView.as_view(), name='organization-detail'),
+    path('api/services/', async_views.ServiceListAsyncView.as_view(), name='services'),
+    path('api/hero-slides/', async_views.HeroSlideListAsyncView.as_view(), name='hero-slides'),
+    path('api/journey-steps/', async_views.JourneyStepListAsyncView.as_view(), name='journey-steps'),
+    path('api/about-us/', async_views.AboutUsDetailAsyncView.as_view(), name='about-us'),
+    path('api/about/', async_views.AboutUsDetailAsyncView.as_view(), name='about'),
+    path('api/team/', async_views.TeamListAsyncView.as_view(), name='team'),
+    path('api/agents/', async_views.AgentListAsyncView.as_view(), name='agents'),
+    path('api/gallery/', async_views.GalleryListAsyncView.as_view(), name='gallery-list'),
+    path('api/gallery/summary/', async_views.GallerySummaryListAsyncView.as_view(), name='gallery-summary'),
+    path('api/gallery/<int:pk>/', async_views.GalleryDetailAsyncView.as_view(), name='gallery-detail'),
+    path('api/news/categories/', async_views.NewsCategoryListAsyncView.as_view(), name='news-categories'),
+    path('api/news/', async_views.NewsListAsyncView.as_view(), name='news-list'),
+    path('api/news/<slug:slug>/', async_views.NewsDetailAsyncView.as_view(), name='news-detail'),
+]
+
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = async_urlpatterns + urlpatterns
@@ -1,5 +1,5 @@
 from django.contrib.auth import login, logout
-from django.db.models import Count, Q
+from django.db.models import Count, Q, Sum
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
@@ -18,8 +18,18 @@ from .models import (
     User, Organization, PropertyType, Property, PropertyImage, Agent,
     PropertyInquiry, PropertyVisit, SavedProperty, Service, HeroSlide,
     JourneyStep, AboutUs, PropertyAlert, Gallery, GalleryImage,
-    NewsCategory, News, Team, Contact, CustomerMessage, CustomerDocument
+    NewsCategory, News, Team, Contact, Conversation, CustomerMessage, CustomerDocument
 )
+from .perf import registry as perf_registry
+from .profiling import collapsed_stacks, store as profile_store
+from .compiled import CompiledListMixin
+from .fieldsets import SparseFieldsMixin
+from .conversations import mark_read
+from .locations import locations as location_index
+from .news import articles as news_articles, cache_key as news_cache_key
+from .search import search_properties
+from .sync import COLLECTIONS as SYNC_COLLECTIONS, sync
+from .throttling import IPRateThrottle, UserRateThrottle
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserSerializer,
     PropertySerializer, PropertyDetailSerializer, PropertyCreateUpdateSerializer,
@@ -30,13 +40,19 @@ from .serializers import (
     PropertyTypeSerializer, OrganizationSerializer, ServiceSerializer,
     AgentSerializer, HeroSlideSerializer, JourneyStepSerializer, AboutUsSerializer,
     PropertyAlertSerializer, PropertyAlertCreateSerializer,
-    GallerySerializer, GalleryImageSerializer, NewsCategorySerializer, NewsSerializer,
+    GallerySerializer, GalleryImageSerializer, NewsCategorySerializer, NewsSerializer, NewsListSerializer,
     TeamSerializer, ContactSerializer, ContactCreateSerializer,
-    CustomerMessageSerializer, CustomerMessageCreateSerializer, CustomerDocumentSerializer
+    ConversationSerializer, CustomerMessageSerializer, CustomerMessageCreateSerializer, CustomerDocumentSerializer,
+    GallerySummarySerializer, ProfilingConfigSerializer, active_gallery_images_prefetch,
+    agent_specializations_prefetch, with_gallery_summary
 )
 
 User = get_user_model()
 
+# Seconds browsers and shared caches may keep public content responses (`cache_max_age`,
+# see app.compression); well within the staleness app.news and app.lookups already allow
+PUBLIC_MAX_AGE = 60
+
 
 # Custom Permission Classes
 class IsAdminRole(BasePermission):
@@ -61,6 +77,8 @@ class UserRegistrationView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserRegistrationSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = 'register'
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -76,6 +94,8 @@ class UserRegistrationView(generics.CreateAPIView):
 
 class UserLoginView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = 'login'
 
     def post(self, request):
         serializer = UserLoginSerializer(data=request.data)
@@ -112,9 +132,11 @@ class UserDetailView(generics.RetrieveUpdateAPIView):
 
 
 # Property Views
-class PropertyViewSet(viewsets.ModelViewSet):
+class PropertyViewSet(SparseFieldsMixin, CompiledListMixin, viewsets.ModelViewSet):
     queryset = Property.objects.filter(is_active=True)
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    query_budget = 4
+    use_read_replica = True
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -143,6 +165,7 @@ class PropertyViewSet(viewsets.ModelViewSet):
         bedrooms = self.request.query_params.get('bedrooms')
         bathrooms = self.request.query_params.get('bathrooms')
         is_featured = self.request.query_params.get('is_featured')
+        search = self.request.query_params.get('search')
 
         if property_type:
             queryset = queryset.filter(property_type_id=property_type)
@@ -158,18 +181,20 @@ class PropertyViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(bathrooms=bathrooms)
         if is_featured:
             queryset = queryset.filter(is_featured=True)
+        if search:
+            return search_properties(queryset, search)
 
         return queryset.order_by('-created_at')
 
     @action(detail=False, methods=['get'])
-    def featured(self, request):
+    def featured(self, request, format=None):
         """Get featured properties"""
         featured_properties = self.get_queryset().filter(is_featured=True)[:6]
         serializer = self.get_serializer(featured_properties, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
-    def recent(self, request):
+    def recent(self, request, format=None):
         """Get recent properties"""
         recent_properties = self.get_queryset()[:10]
         serializer = self.get_serializer(recent_properties, many=True)
@@ -180,9 +205,12 @@ class PropertyViewSet(viewsets.ModelViewSet):
 class CustomerSavedPropertiesView(generics.ListAPIView):
     serializer_class = SavedPropertySerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 5
 
     def get_queryset(self):
-        return SavedProperty.objects.filter(customer=self.request.user).select_related('property')
+        return SavedProperty.objects.filter(customer=self.request.user).select_related(
+            'property__property_type'
+        ).prefetch_related('property__images')
 
 
 class CustomerSavedPropertyCreateView(generics.CreateAPIView):
@@ -226,14 +254,21 @@ class CustomerSavedPropertyDeleteView(generics.DestroyAPIView):
 class CustomerInquiriesView(generics.ListAPIView):
     serializer_class = PropertyInquirySerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 6
 
     def get_queryset(self):
-        return PropertyInquiry.objects.filter(customer=self.request.user).select_related('property', 'agent').order_by('-created_at')
+        return PropertyInquiry.objects.filter(customer=self.request.user).select_related(
+            'customer', 'property__property_type', 'agent'
+        ).prefetch_related(
+            'property__images', agent_specializations_prefetch('agent__specializations')
+        ).order_by('-created_at')
 
 
 class CustomerInquiryCreateView(generics.CreateAPIView):
     serializer_class = PropertyInquiryCreateSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = [IPRateThrottle, UserRateThrottle]
+    throttle_scope = 'inquiry'
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -244,9 +279,14 @@ class CustomerInquiryCreateView(generics.CreateAPIView):
 class CustomerVisitsView(generics.ListAPIView):
     serializer_class = PropertyVisitSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 6
 
     def get_queryset(self):
-        return PropertyVisit.objects.filter(customer=self.request.user).select_related('property', 'agent').order_by('-scheduled_date')
+        return PropertyVisit.objects.filter(customer=self.request.user).select_related(
+            'customer', 'property__property_type', 'agent'
+        ).prefetch_related(
+            'property__images', agent_specializations_prefetch('agent__specializations')
+        ).order_by('-scheduled_date')
 
 
 class CustomerVisitCreateView(generics.CreateAPIView):
@@ -262,9 +302,59 @@ class CustomerVisitCreateView(generics.CreateAPIView):
 class CustomerMessagesView(generics.ListAPIView):
     serializer_class = CustomerMessageSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 6
 
     def get_queryset(self):
-        return CustomerMessage.objects.filter(customer=self.request.user).select_related('agent', 'property').order_by('-created_at')
+        return CustomerMessage.objects.filter(customer=self.request.user).select_related(
+            'agent', 'property__property_type'
+        ).prefetch_related(
+            'property__images', agent_specializations_prefetch('agent__specializations')
+        ).order_by('-created_at')
+
+
+class CustomerConversationsView(generics.ListAPIView):
+    """The customer's inbox: one row per conversation, most recent activity first"""
+    serializer_class = ConversationSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = 6
+
+    def get_queryset(self):
+        return Conversation.objects.filter(customer=self.request.user).select_related(
+            'agent', 'property__property_type', 'last_message'
+        ).prefetch_related(
+            'property__images', agent_specializations_prefetch('agent__specializations')
+        ).order_by('-last_activity_at', '-id')
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        # Inbox badge total across all pages
+        unread = Conversation.objects.filter(customer=request.user).aggregate(total=Sum('unread_count'))['total']
+        response.data['unread_total'] = unread or 0
+        return response
+
+
+class CustomerConversationMessagesView(generics.ListAPIView):
+    """Messages in one of the customer's conversations, newest first"""
+    serializer_class = CustomerMessageSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = 7
+
+    def get_queryset(self):
+        conversation = get_object_or_404(Conversation, pk=self.kwargs['pk'], customer=self.request.user)
+        return conversation.messages.select_related(
+            'agent', 'property__property_type'
+        ).prefetch_related(
+            'property__images', agent_specializations_prefetch('agent__specializations')
+        ).order_by('-created_at', '-id')
+
+
+class CustomerConversationReadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        conversation = get_object_or_404(Conversation, pk=pk, customer=request.user)
+        marked = mark_read(conversation)
+        return Response({'marked_read': marked})
 
 
 class CustomerMessageCreateView(generics.CreateAPIView):
@@ -280,9 +370,12 @@ class CustomerMessageCreateView(generics.CreateAPIView):
 class CustomerDocumentsView(generics.ListAPIView):
     serializer_class = CustomerDocumentSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 5
 
     def get_queryset(self):
-        return CustomerDocument.objects.filter(customer=self.request.user, is_active=True).select_related('property').order_by('-created_at')
+        return CustomerDocument.objects.filter(customer=self.request.user, is_active=True).select_related(
+            'property__property_type'
+        ).prefetch_related('property__images').order_by('-created_at')
 
 
 class CustomerDocumentDownloadView(generics.RetrieveAPIView):
@@ -308,6 +401,17 @@ class CustomerDocumentDownloadView(generics.RetrieveAPIView):
             return Response({'message': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+class CustomerSyncView(APIView):
+    """Delta sync of the dashboard collections; see app.sync for the protocol"""
+    permission_classes = [IsAuthenticated]
+    query_budget = 30
+    # Each collection runs the same prefetches once; that is not N+1
+    n_plus_one_threshold = len(SYNC_COLLECTIONS) + 1
+
+    def get(self, request):
+        return Response(sync(request))
+
+
 # Admin Dashboard Views
 class AdminAnalyticsView(APIView):
     permission_classes = [IsAdminRole]
@@ -330,8 +434,14 @@ class AdminAnalyticsView(APIView):
         ).count()
         
         # Get recent properties and inquiries
-        recent_properties = Property.objects.filter(is_active=True).order_by('-created_at')[:5]
-        recent_inquiries = PropertyInquiry.objects.select_related('customer', 'property').order_by('-created_at')[:5]
+        recent_properties = Property.objects.filter(is_active=True).select_related(
+            'property_type'
+        ).prefetch_related('images').order_by('-created_at')[:5]
+        recent_inquiries = PropertyInquiry.objects.select_related(
+            'customer', 'property__property_type', 'agent'
+        ).prefetch_related(
+            'property__images', agent_specializations_prefetch('agent__specializations')
+        ).order_by('-created_at')[:5]
         
         analytics_data = {
             'total_properties': total_properties,
@@ -348,6 +458,63 @@ class AdminAnalyticsView(APIView):
         return Response(analytics_data)
 
 
+class AdminPerfView(APIView):
+    """Rolling per-endpoint latency percentiles (milliseconds) from app.perf"""
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        return Response({
+            'window_seconds': perf_registry.window_seconds,
+            'endpoints': perf_registry.snapshot(),
+        })
+
+
+class AdminProfilingConfigView(APIView):
+    """View or change which endpoints are profiled and the slow-request threshold"""
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        return Response(ProfilingConfigSerializer(profile_store.config).data)
+
+    def put(self, request):
+        serializer = ProfilingConfigSerializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        config = profile_store.configure(**serializer.validated_data)
+        return Response(ProfilingConfigSerializer(config).data)
+
+
+class AdminProfileListView(APIView):
+    """List captured slow-request profiles, newest first"""
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        return Response(profile_store.list())
+
+    def delete(self, request):
+        profile_store.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AdminProfileDownloadView(APIView):
+    """Download a profile as a pstats file or as collapsed stacks"""
+    permission_classes = [IsAdminRole]
+
+    def get(self, request, profile_id):
+        entry = profile_store.get(profile_id)
+        if entry is None:
+            return Response({'message': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        from django.http import HttpResponse
+        if entry['kind'] == 'pstats':
+            response = HttpResponse(entry['data'], content_type='application/octet-stream')
+            filename = f"profile-{entry['id']}.prof"
+        else:
+            response = HttpResponse(collapsed_stacks(entry), content_type='text/plain')
+            filename = f"profile-{entry['id']}.collapsed.txt"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
 class AdminUserManagementViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     permission_classes = [IsAdminRole]
@@ -475,12 +642,32 @@ class AdminUserManagementViewSet(viewsets.ModelViewSet):
         })
 
 
+class LocationAutocompleteView(APIView):
+    """Locations with a word starting with ?q=, most listed first, from the in-process index in app.locations"""
+    permission_classes = [permissions.AllowAny]
+    # Called on every keystroke; nothing here depends on who is asking
+    authentication_classes = []
+    query_budget = 1
+    use_read_replica = True
+    max_limit = 50
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), self.max_limit)
+        except ValueError:
+            limit = 10
+        results = location_index.search(request.query_params.get('q', ''), limit)
+        return Response([{'location': location, 'listings': listings} for location, listings in results])
+
+
 # Additional Views for better API functionality
 class PropertyTypeListView(generics.ListAPIView):
     """Get all property types for filtering"""
     queryset = PropertyType.objects.filter(is_active=True)
     serializer_class = PropertyTypeSerializer
     permission_classes = [permissions.AllowAny]
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
 
 
 class OrganizationDetailView(generics.RetrieveAPIView):
@@ -488,6 +675,8 @@ class OrganizationDetailView(generics.RetrieveAPIView):
     queryset = Organization.objects.all()
     serializer_class = OrganizationSerializer
     permission_classes = [permissions.AllowAny]
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
     
     def get_object(self):
         return Organization.objects.first()
@@ -498,6 +687,8 @@ class ServiceListView(generics.ListAPIView):
     queryset = Service.objects.filter(is_active=True).order_by('order')
     serializer_class = ServiceSerializer
     permission_classes = [permissions.AllowAny]
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
 
 
 class HeroSlideListView(generics.ListAPIView):
@@ -505,6 +696,8 @@ class HeroSlideListView(generics.ListAPIView):
     queryset = HeroSlide.objects.filter(is_active=True).order_by('order')
     serializer_class = HeroSlideSerializer
     permission_classes = [permissions.AllowAny]
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
 
 
 class JourneyStepListView(generics.ListAPIView):
@@ -512,13 +705,18 @@ class JourneyStepListView(generics.ListAPIView):
     queryset = JourneyStep.objects.filter(is_active=True).order_by('order')
     serializer_class = JourneyStepSerializer
     permission_classes = [permissions.AllowAny]
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
 
 
-class AgentListView(generics.ListAPIView):
+class AgentListView(SparseFieldsMixin, generics.ListAPIView):
     """Get all active agents (team page)"""
-    queryset = Agent.objects.filter(is_active=True)
+    queryset = Agent.objects.filter(is_active=True).prefetch_related(agent_specializations_prefetch())
     serializer_class = AgentSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 4
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
 
 
 class AboutUsDetailView(generics.RetrieveAPIView):
@@ -526,6 +724,8 @@ class AboutUsDetailView(generics.RetrieveAPIView):
     queryset = AboutUs.objects.filter(is_active=True)
     serializer_class = AboutUsSerializer
     permission_classes = [permissions.AllowAny]
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
     
     def get_object(self):
         return AboutUs.objects.filter(is_active=True).first()
@@ -555,7 +755,7 @@ class AdminJourneyStepManagementViewSet(viewsets.ModelViewSet):
 
 class AdminAgentManagementViewSet(viewsets.ModelViewSet):
     """Admin CRUD for agents"""
-    queryset = Agent.objects.all()
+    queryset = Agent.objects.prefetch_related(agent_specializations_prefetch())
     serializer_class = AgentSerializer
     permission_classes = [IsAdminUser]
 
@@ -613,7 +813,7 @@ class AdminContactsView(APIView):
         # Use the real Contact model
         from django.db.models import Q
 
-        queryset = Contact.objects.all().order_by('-created_at')
+        queryset = Contact.objects.select_related('customer').order_by('-created_at')
 
         # Filter parameters
         status_filter = request.query_params.get('status')
@@ -731,16 +931,45 @@ class PropertyAlertDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 # Gallery Views
-class GalleryListView(generics.ListAPIView):
-    queryset = Gallery.objects.filter(is_active=True)
+class GalleryListView(SparseFieldsMixin, generics.ListAPIView):
+    queryset = Gallery.objects.filter(is_active=True).prefetch_related(active_gallery_images_prefetch())
     serializer_class = GallerySerializer
     permission_classes = [permissions.AllowAny]
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
+
+
+class GallerySummaryListView(generics.ListAPIView):
+    """Active galleries with cover, image count and last change instead of their images"""
+    # Aggregating drops Meta.ordering, so order explicitly
+    queryset = with_gallery_summary(Gallery.objects.filter(is_active=True)).order_by('order', '-created_at')
+    serializer_class = GallerySummarySerializer
+    permission_classes = [permissions.AllowAny]
+    query_budget = 2
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
 
 
 class GalleryDetailView(generics.RetrieveAPIView):
-    queryset = Gallery.objects.filter(is_active=True)
+    queryset = Gallery.objects.filter(is_active=True).prefetch_related(active_gallery_images_prefetch())
     serializer_class = GallerySerializer
     permission_classes = [permissions.AllowAny]
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
+
+
+class GalleryImageListView(generics.ListAPIView):
+    """Active images of one gallery, a page at a time"""
+    serializer_class = GalleryImageSerializer
+    permission_classes = [permissions.AllowAny]
+    query_budget = 3
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
+
+    def get_queryset(self):
+        gallery = get_object_or_404(Gallery, pk=self.kwargs['pk'], is_active=True)
+        # Served from galleryimage_listing_idx
+        return gallery.images.filter(is_active=True).order_by('order', 'created_at')
 
 
 # News Views
@@ -748,14 +977,18 @@ class NewsCategoryListView(generics.ListAPIView):
     queryset = NewsCategory.objects.filter(is_active=True)
     serializer_class = NewsCategorySerializer
     permission_classes = [permissions.AllowAny]
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
 
 
-class NewsListView(generics.ListAPIView):
-    serializer_class = NewsSerializer
+class NewsListView(SparseFieldsMixin, generics.ListAPIView):
+    serializer_class = NewsListSerializer
     permission_classes = [permissions.AllowAny]
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
 
     def get_queryset(self):
-        queryset = News.objects.filter(is_published=True)
+        queryset = News.objects.filter(is_published=True).select_related('category').defer('content')
         category = self.request.query_params.get('category', None)
         featured = self.request.query_params.get('featured', None)
 
@@ -768,10 +1001,22 @@ class NewsListView(generics.ListAPIView):
 
 
 class NewsDetailView(generics.RetrieveAPIView):
-    queryset = News.objects.filter(is_published=True)
+    """A published article, served from the in-process article cache (app.news) when possible"""
+    queryset = News.objects.filter(is_published=True).select_related('category')
     serializer_class = NewsSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
+
+    def retrieve(self, request, *args, **kwargs):
+        key = news_cache_key(request, self.kwargs['slug'])
+        data = news_articles.get(key)
+        if data is None:
+            generation = news_articles.generation
+            data = super().retrieve(request, *args, **kwargs).data
+            news_articles.set(key, data, generation)
+        return Response(data)
 
 
 # Admin Management ViewSets for Gallery and News
@@ -853,6 +1098,8 @@ class TeamListView(generics.ListAPIView):
     queryset = Team.objects.filter(is_active=True).order_by('order', 'name')
     serializer_class = TeamSerializer
     permission_classes = [permissions.AllowAny]
+    use_read_replica = True
+    cache_max_age = PUBLIC_MAX_AGE
 
 
 class AdminTeamManagementViewSet(viewsets.ModelViewSet):
@@ -867,6 +1114,8 @@ class ContactCreateView(generics.CreateAPIView):
     """Create a new contact submission (public endpoint)"""
     serializer_class = ContactCreateSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle, UserRateThrottle]
+    throttle_scope = 'contact'
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -889,9 +1138,10 @@ class AdminContactManagementViewSet(viewsets.ModelViewSet):
     queryset = Contact.objects.all().order_by('-created_at')
     serializer_class = ContactSerializer
     permission_classes = [IsAdminUser]
+    query_budget = 4
 
     def get_queryset(self):
-        queryset = Contact.objects.all().order_by('-created_at')
+        queryset = Contact.objects.select_related('customer').order_by('-created_at')
 
         # Filter parameters
         status_filter = self.request.query_params.get('status')
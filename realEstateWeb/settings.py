@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import os
 
+from .db_config import database_from_env, replicas_from_env
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -48,7 +50,12 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'app.User'
 
 MIDDLEWARE = [
+    'app.middleware.RequestTimingMiddleware',
+    'app.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'app.middleware.ReplicaRoutingMiddleware',
+    'app.middleware.QueryInspectorMiddleware',
+    'app.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,18 +84,35 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'realEstateWeb.wsgi.application'
+ASGI_APPLICATION = 'realEstateWeb.asgi.application'
+
+# Serve the public read endpoints from app/async_views.py; enable when running under ASGI
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', '').lower() in ('1', 'true', 'yes')
 
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Configured from DATABASE_URL (SQLite or PostgreSQL), see realEstateWeb/db_config.py.
+# Without it the project uses the local db.sqlite3 file. PostgreSQL support is
+# experimental: the suite is only run against it when PostgreSQL is available
+# (see "PostgreSQL (experimental)" in README.md).
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_from_env(BASE_DIR / 'db.sqlite3'),
+    # DATABASE_REPLICA_URLS (comma separated) adds read replicas replica_1, replica_2, ...
+    **replicas_from_env(),
+}
+
+DATABASE_ROUTERS = ['app.routers.ReplicaRouter']
+
+# Read-only views (use_read_replica = True) read from these; see app/routers.py
+READ_REPLICAS = {
+    'DATABASES': [alias for alias in DATABASES if alias != 'default'],
+    'STICKY_SECONDS': int(os.environ.get('DATABASE_REPLICA_STICKY_SECONDS', 10)),
 }
 
+# New SQLite connections get app.db.DEFAULT_SQLITE_PRAGMAS, plus SQLITE_PRAGMAS if set.
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -109,6 +133,23 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+PASSWORD_HASHERS = [
+    'app.passwords.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Password hashing pool (see app.passwords). Hashes are computed on a bounded
+# pool so login/registration bursts cannot oversubscribe the CPU.
+PASSWORD_HASHING = {
+    'POOL': os.environ.get('PASSWORD_HASHING_POOL', 'thread'),
+    'MAX_WORKERS': None,
+    'ITERATIONS': None,
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -144,10 +185,34 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.TokenAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
+    # orjson-backed drop-ins for DRF's JSONRenderer/JSONParser, byte-identical output.
+    # They fall back to the stdlib json module when orjson is not installed.
+    'DEFAULT_RENDERER_CLASSES': [
+        'app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'app.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Per-view rates for app.throttling, keyed '<throttle_scope>.<ip|user>'
+    'DEFAULT_THROTTLE_RATES': {
+        'contact.ip': '5/min',
+        'contact.user': '10/min',
+        'inquiry.ip': '20/min',
+        'inquiry.user': '10/min',
+        'login.ip': '10/min',
+        'register.ip': '5/hour',
+    },
 }
 
+# Throttle bucket storage. Use 'app.throttling.CacheRateStore' to share limits
+# across worker processes through the default cache backend.
+THROTTLE_STORE = 'app.throttling.LocalMemoryRateStore'
+
 # CORS Settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -177,6 +242,66 @@ CSRF_TRUSTED_ORIGINS = [
     "https://simthalirealestate.com",
 ]
 
+# App settings. Each dict below is merged over the defaults of the module named
+# in its comment, so it only lists the keys it changes. Left out entirely (as
+# COMPRESSION and NEWS_CACHE are), a setting uses those defaults.
+
+# Query inspection (app.middleware.QueryInspectorMiddleware). Logs requests
+# that exceed their view's query_budget or repeat a query shape (N+1).
+QUERY_INSPECTOR = {
+    'ENABLED': DEBUG,
+    'STRICT': False,
+    'N_PLUS_ONE_THRESHOLD': 3,
+}
+
+# Request timing (app.middleware.RequestTimingMiddleware). Percentiles are
+# served from in-memory histograms at /api/admin/perf/. PERF_LOG=1 also writes
+# one JSON line per request to perf.log (rotated at 10 MB).
+PERF_MONITORING = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'LOG': os.environ.get('PERF_LOG') == '1',
+    'WINDOW_SECONDS': 900,
+}
+
+# COMPRESSION: gzip/brotli response compression (app.compression). Compressed
+# copies of responses with a max-age are kept in CACHE_ALIAS for CACHE_TIMEOUT seconds.
+
+# Pre-generated sitemaps and RSS/Atom feeds (app/sitemaps.py), written into ROOT by
+# `manage.py build_sitemaps` and served from there with Last-Modified.
+SITEMAPS = {'SITE_URL': os.environ['SITE_URL']} if 'SITE_URL' in os.environ else {}
+
+# NEWS_CACHE: in-process cache of news article detail responses (app/news.py),
+# cleared on local news writes; TTL (seconds) bounds staleness across processes.
+
+# Live customer events (app/events.py). Set CHANNEL to 'app.events.PostgresChannel'
+# (experimental) when running several processes on PostgreSQL, so every process
+# sees every event.
+EVENTS = {
+    'CHANNEL': os.environ.get('EVENTS_CHANNEL', 'app.events.LocalChannel'),
+    'QUEUE_SIZE': 100,
+    'REPLAY_SIZE': 50,
+    'HEARTBEAT_SECONDS': 15,
+}
+
+# Delta sync for the customer dashboard (app.sync). Clients whose watermark is
+# older than TOMBSTONE_DAYS get a full listing; prune with prune_sync_tombstones.
+SYNC = {
+    'MAX_ROWS': 200,
+    'OVERLAP_SECONDS': 5,
+    'TOMBSTONE_DAYS': 30,
+}
+
+# Slow-request profiling (app.profiling). Admins can change these at runtime
+# through /api/admin/profiling/; captured profiles are at /api/admin/profiles/.
+PROFILING = {
+    'ENDPOINTS': [],
+    'THRESHOLD_MS': 500,
+    'MODE': 'cprofile',
+    'MAX_PROFILES': 20,
+    'HEADER_TOKEN': os.environ.get('PROFILING_HEADER_TOKEN'),
+}
+
 # Logging Configuration
 LOGGING = {
     'version': 1,
@@ -190,6 +315,10 @@ LOGGING = {
             'format': '{levelname} {message}',
             'style': '{',
         },
+        'json': {
+            'format': '{message}',
+            'style': '{',
+        },
     },
     'handlers': {
         'file': {
@@ -203,6 +332,16 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
+        'perf_file': {
+            'level': 'INFO',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.path.join(BASE_DIR, 'perf.log'),
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 3,
+            # Not created until PERF_MONITORING['LOG'] writes to it
+            'delay': True,
+            'formatter': 'json',
+        },
     },
     'root': {
         'handlers': ['console', 'file'],
@@ -219,5 +358,11 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': False,
         },
+        # One JSON object per request from RequestTimingMiddleware
+        'app.perf': {
+            'handlers': ['perf_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
\ No newline at end of file